@@ -1,5 +1,15 @@
 from django.contrib import admin
-from .models import Budget, Category, Loans, Investment, InvestmentsThroughTime, NetWorth
+from .models import (
+    Budget,
+    Category,
+    Loans,
+    Investment,
+    InvestmentsThroughTime,
+    NetWorth,
+    InvestmentsRollup,
+    NetWorthRollup,
+    Job,
+)
 
 # Register your models here.
 
@@ -34,9 +44,20 @@ class NetWorthAdmin(admin.ModelAdmin):
     list_display = ("user_name", "total_net_worth",'date')
     list_filter = ("user_name",)
 
+class SnapshotRollupAdmin(admin.ModelAdmin):
+    list_display = ("user_name", "period", "period_start", "open", "close", "low", "high")
+    list_filter = ("user_name", "period")
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("user_name", "kind", "status", "created_at", "finished_at")
+    list_filter = ("kind", "status")
+
 admin.site.register(Budget, BudgetAdmin)
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Loans, LoansAdmin)
 admin.site.register(Investment, InvestmentAdmin)
 admin.site.register(InvestmentsThroughTime, InvestmentsThroughTimeAdmin)
-admin.site.register(NetWorth, NetWorthAdmin)
\ No newline at end of file
+admin.site.register(NetWorth, NetWorthAdmin)
+admin.site.register(InvestmentsRollup, SnapshotRollupAdmin)
+admin.site.register(NetWorthRollup, SnapshotRollupAdmin)
+admin.site.register(Job, JobAdmin)
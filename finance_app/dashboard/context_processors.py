@@ -0,0 +1,6 @@
+from .functions.chart_renderers import chart_renderer as request_chart_renderer
+
+
+def chart_renderer(request):
+    """Exposes the chart renderer of the request, so templates only load plotly.js when it is used."""
+    return {"chart_renderer": request_chart_renderer(request)}
@@ -0,0 +1,40 @@
+import os
+
+from django.contrib.staticfiles.finders import BaseFinder
+from django.core.files.storage import FileSystemStorage
+
+from .functions.plotly_assets import (
+    PLOTLY_JS_FILENAME,
+    plotly_js_source_path,
+    plotly_js_static_name,
+)
+
+
+class PlotlyJSStorage(FileSystemStorage):
+    """Read-only storage exposing the bundled plotly.js under its content-hashed static name."""
+
+    def __init__(self):
+        super().__init__(location=os.path.dirname(plotly_js_source_path()))
+
+    def path(self, name):
+        if name == plotly_js_static_name():
+            name = PLOTLY_JS_FILENAME
+        return super().path(name)
+
+
+class PlotlyJSFinder(BaseFinder):
+    """Static files finder serving plotly.js straight from the installed plotly package.
+    This way `collectstatic` and `runserver` pick up the bundle without copying it into the repository.
+    """
+
+    def check(self, **kwargs):
+        return []
+
+    def find(self, path, find_all=False, **kwargs):
+        if path != plotly_js_static_name():
+            return [] if find_all else None
+        match = plotly_js_source_path()
+        return [match] if find_all else match
+
+    def list(self, ignore_patterns):
+        yield plotly_js_static_name(), PlotlyJSStorage()
@@ -3,7 +3,9 @@ from django.core.validators import MinValueValidator, MaxValueValidator
 from .models import Loans, Investment
 from .list_and_dictionaries.statuses import (
     BUDGET_CATEGORY_CHOICES,
+    IMPORT_KIND_CHOICES,
     INVESTMENT_CATEGORIES,
+    LOAN_STRATEGY_CHOICES,
 )
 
 
@@ -59,6 +61,19 @@ class LoanForm(forms.ModelForm):
         }
 
 
+class LoanProjectionForm(forms.Form):
+    strategy = forms.ChoiceField(
+        choices=LOAN_STRATEGY_CHOICES, initial="avalanche", label="Strategy"
+    )
+    extra_payment = forms.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        min_value=0,
+        initial=0,
+        label="Extra Monthly Payment",
+    )
+
+
 class InvestmentForm(forms.ModelForm):
     class Meta:
         model = Investment
@@ -83,3 +98,8 @@ class InvestmentForm(forms.ModelForm):
         }
 
 
+class ImportForm(forms.Form):
+    kind = forms.ChoiceField(choices=IMPORT_KIND_CHOICES, label="Import")
+    file = forms.FileField(
+        label="CSV File", help_text="The first row must name the columns."
+    )
@@ -0,0 +1,276 @@
+import io
+import statistics
+import time
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .. import urls as dashboard_urls
+from .chart_cache import store_chart_image
+from .figure_spec import pie_figure
+from .svg_charts import render_svg
+
+# Routes of dashboard/urls.py that are not worth timing
+SKIPPED_ROUTES = {"logout"}
+
+
+def _management_form(prefix, total):
+    return {
+        f"{prefix}-TOTAL_FORMS": str(total),
+        f"{prefix}-INITIAL_FORMS": "0",
+        f"{prefix}-MIN_NUM_FORMS": "1",
+        f"{prefix}-MAX_NUM_FORMS": "20",
+    }
+
+
+def budget_post_data(action, allocations=10):
+    data = {
+        "budget-budget_name": "Benchmark budget",
+        "budget-money_amount": "5000",
+        "action": action,
+        **_management_form("allocations", allocations),
+    }
+    for i in range(allocations):
+        data[f"allocations-{i}-category"] = "food"
+        data[f"allocations-{i}-percentage"] = "5"
+    return data
+
+
+def portfolio_post_data(action, investments=10):
+    data = {"action": action, **_management_form("form", investments)}
+    for i in range(investments):
+        data[f"form-{i}-investment_name"] = f"Benchmark investment {i}"
+        data[f"form-{i}-amount"] = "1000"
+        data[f"form-{i}-category_name"] = "Stocks"
+    return data
+
+
+class RewindingUpload(io.BytesIO):
+    """An in-memory upload the test client can post more than once: every read starts from the beginning."""
+
+    def __init__(self, content, name):
+        super().__init__(content)
+        self.name = name
+
+    def read(self, *args):
+        self.seek(0)
+        return super().read(*args)
+
+
+def import_post_data(kind, rows=100):
+    lines = {
+        "loans": ["loan_name,amount,interest_rate,due_date"]
+        + [f"Imported loan {i},{1000 + i},4.5,2035-01-01" for i in range(rows)],
+        "investments": ["investment_name,amount,category_name"]
+        + [f"Imported investment {i},{1000 + i},Stocks" for i in range(rows)],
+    }[kind]
+    content = "\n".join(lines).encode()
+    return {"kind": kind, "file": RewindingUpload(content, f"{kind}.csv")}
+
+
+def benchmark_scenarios(user):
+    """Returns (name, url name, method, path, data) for every dashboard route, using the user's own objects."""
+    budget = user.budgets.order_by("pk").first()
+    loan = user.loans.order_by("pk").first()
+    loan_data = {
+        "loan-loan_name": "Benchmark loan",
+        "loan-amount": "10000",
+        "loan-interest_rate": "4.5",
+        "loan-due_date": "2035-01-01",
+    }
+    scenarios = [
+        ("dashboard", "dashboard", "get", reverse("dashboard"), None),
+        ("budget_creation", "budget_creation", "get", reverse("budget_creation"), None),
+        (
+            "budget_creation submit_budget",
+            "budget_creation",
+            "post",
+            reverse("budget_creation"),
+            budget_post_data("submit_budget"),
+        ),
+        (
+            "budget_creation save_budget",
+            "budget_creation",
+            "post",
+            reverse("budget_creation"),
+            budget_post_data("save_budget"),
+        ),
+        (
+            "api_budget_preview",
+            "api_budget_preview",
+            "post",
+            reverse("api_budget_preview"),
+            budget_post_data("submit_budget"),
+        ),
+        ("your_budget", "your_budget", "get", reverse("your_budget"), None),
+        ("loans", "loans", "get", reverse("loans"), None),
+        ("loans add", "loans", "post", reverse("loans"), loan_data),
+        (
+            "loans projection",
+            "loans",
+            "get",
+            f"{reverse('loans')}?strategy=snowball&extra_payment=250",
+            None,
+        ),
+        (
+            "portfolio_creation",
+            "portfolio_creation",
+            "get",
+            reverse("portfolio_creation"),
+            None,
+        ),
+        (
+            "portfolio_creation submit_portfolio",
+            "portfolio_creation",
+            "post",
+            reverse("portfolio_creation"),
+            portfolio_post_data("submit_portfolio"),
+        ),
+        (
+            "portfolio_creation save_portfolio_value",
+            "portfolio_creation",
+            "post",
+            reverse("portfolio_creation"),
+            portfolio_post_data("save_portfolio_value"),
+        ),
+        ("net_worth", "net_worth", "get", reverse("net_worth"), None),
+        ("import_data", "import_data", "get", reverse("import_data"), None),
+        (
+            "import_data loans",
+            "import_data",
+            "post",
+            reverse("import_data"),
+            import_post_data("loans"),
+        ),
+        (
+            "import_data investments",
+            "import_data",
+            "post",
+            reverse("import_data"),
+            import_post_data("investments"),
+        ),
+        ("export_data", "export_data", "get", reverse("export_data"), None),
+        (
+            "export_data ndjson",
+            "export_data",
+            "get",
+            f"{reverse('export_data')}?format=ndjson",
+            None,
+        ),
+        (
+            "net_worth svg",
+            "net_worth",
+            "get",
+            f"{reverse('net_worth')}?chart=svg",
+            None,
+        ),
+        (
+            "portfolio_creation svg",
+            "portfolio_creation",
+            "get",
+            f"{reverse('portfolio_creation')}?chart=svg",
+            None,
+        ),
+        (
+            "chart_image",
+            "chart_image",
+            "get",
+            reverse(
+                "chart_image",
+                args=[store_chart_image(user, render_svg(pie_figure(["A"], [1], {})))],
+            ),
+            None,
+        ),
+    ]
+    for series in ("api_net_worth_series", "api_investment_series"):
+        for date_range in ("30d", "1y", "all"):
+            scenarios.append(
+                (
+                    f"{series} {date_range}",
+                    series,
+                    "get",
+                    f"{reverse(series)}?range={date_range}",
+                    None,
+                )
+            )
+    if budget:
+        scenarios += [
+            (
+                "budget_detail",
+                "budget_detail",
+                "get",
+                reverse("budget_detail", args=[budget.pk]),
+                None,
+            ),
+            (
+                "budget_detail svg",
+                "budget_detail",
+                "get",
+                f"{reverse('budget_detail', args=[budget.pk])}?chart=svg",
+                None,
+            ),
+            (
+                "budget_delete",
+                "budget_delete",
+                "post",
+                reverse("budget_delete", args=[budget.pk]),
+                {},
+            ),
+        ]
+    if loan:
+        scenarios.append(
+            (
+                "loan_delete",
+                "loan_delete",
+                "post",
+                reverse("loan_delete", args=[loan.pk]),
+                {},
+            )
+        )
+    return scenarios
+
+
+def uncovered_routes(scenarios):
+    """Returns the names of dashboard routes that no scenario exercises."""
+    names = {pattern.name for pattern in dashboard_urls.urlpatterns} - SKIPPED_ROUTES
+    return sorted(names - {scenario[1] for scenario in scenarios})
+
+
+def _percentile(samples, percent):
+    if len(samples) < 2:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[percent - 1]
+
+
+def run_scenario(client, method, path, data, iterations):
+    """Requests path `iterations` times and returns latency percentiles, response size and query counts.
+    Every request runs in a rolled back transaction so write scenarios leave the data untouched.
+    """
+    timings, sizes, queries, statuses = [], [], [], set()
+
+    for _ in range(iterations):
+        with transaction.atomic(), CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = getattr(client, method)(path, data)
+            body = (
+                b"".join(response.streaming_content)
+                if response.streaming
+                else response.content
+            )
+            timings.append((time.perf_counter() - started) * 1000)
+            transaction.set_rollback(True)
+        sizes.append(len(body))
+        queries.append(len(captured.captured_queries))
+        statuses.add(response.status_code)
+
+    return {
+        "iterations": iterations,
+        "status_codes": sorted(statuses),
+        "p50_ms": round(_percentile(timings, 50), 3),
+        "p95_ms": round(_percentile(timings, 95), 3),
+        "p99_ms": round(_percentile(timings, 99), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "response_bytes": max(sizes),
+        "queries": max(queries),
+    }
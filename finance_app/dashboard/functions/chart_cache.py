@@ -0,0 +1,98 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from . import metrics
+from .svg_charts import svg_digest
+
+
+def _chart_cache():
+    return caches[settings.CHART_CACHE_ALIAS]
+
+
+def _version_key(user_id):
+    return f"chart-version:{user_id}"
+
+
+def get_data_version(user):
+    """Returns the current data version of the user's charts.
+    Versions start from a timestamp, so a version evicted from the cache never reuses an old number.
+    """
+    cache = _chart_cache()
+    key = _version_key(user.pk)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_data_version(user):
+    """Invalidates every cached chart of the user. Call it after any write to the user's financial data."""
+    cache = _chart_cache()
+    key = _version_key(user.pk)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def get_or_build_chart(user, chart_name, object_id, build_chart):
+    """Returns the rendered chart for (user, chart_name, object_id) at the current data version.
+    On a miss build_chart() is called and its output (the rendered chart markup) is cached.
+    """
+    cache = _chart_cache()
+    key = f"chart:{user.pk}:{chart_name}:{object_id}:{get_data_version(user)}"
+    chart = cache.get(key)
+    if chart is None:
+        metrics.increment(
+            "finance_app_chart_cache_requests_total", chart=chart_name, result="miss"
+        )
+        chart = build_chart()
+        cache.set(key, chart)
+    else:
+        metrics.increment(
+            "finance_app_chart_cache_requests_total", chart=chart_name, result="hit"
+        )
+    return chart
+
+
+def get_or_compute(name, inputs, compute):
+    """Returns the cached result of compute() for the given inputs (any JSON-serializable value),
+    computing it on a miss. Keyed on a hash of the inputs rather than on a user's data version,
+    so users with the same inputs share it and it never goes stale.
+    """
+    cache = _chart_cache()
+    digest = hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+    key = f"{name}:{digest}"
+    result = cache.get(key)
+    if result is None:
+        metrics.increment(
+            "finance_app_chart_cache_requests_total", chart=name, result="miss"
+        )
+        result = compute()
+        cache.set(key, result)
+    else:
+        metrics.increment(
+            "finance_app_chart_cache_requests_total", chart=name, result="hit"
+        )
+    return result
+
+
+def _image_key(user_id, digest):
+    return f"chart-image:{user_id}:{digest}"
+
+
+def store_chart_image(user, svg):
+    """Keeps a rendered SVG chart under its content hash, for ChartImageView; returns the hash."""
+    digest = svg_digest(svg)
+    _chart_cache().add(_image_key(user.pk, digest), svg)
+    return digest
+
+
+def get_chart_image(user, digest):
+    """Returns the user's SVG chart stored under digest, or None once it left the cache."""
+    return _chart_cache().get(_image_key(user.pk, digest))
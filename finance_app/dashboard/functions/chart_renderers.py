@@ -0,0 +1,29 @@
+from django.conf import settings
+
+from .figure_spec import render_figure
+from .svg_charts import render_svg
+from ..list_and_dictionaries.statuses import CHART_DATE_RANGES
+
+# Renderers of figure_spec figures: interactive Plotly (needs plotly.js) or static inline SVG
+CHART_RENDERERS = {
+    "plotly": render_figure,
+    "svg": render_svg,
+}
+CHART_RENDERER_PARAMETER = "chart"  # ?chart=svg
+
+
+def chart_renderer(request):
+    """Returns the renderer asked for with ?chart=, or settings.CHART_RENDERER."""
+    renderer = request.GET.get(CHART_RENDERER_PARAMETER)
+    return renderer if renderer in CHART_RENDERERS else settings.CHART_RENDERER
+
+
+def render_chart(figure, renderer=None):
+    """Renders a figure with the given renderer (default: settings.CHART_RENDERER)."""
+    return CHART_RENDERERS[renderer or settings.CHART_RENDERER](figure)
+
+
+def chart_date_range(request):
+    """Returns the CHART_DATE_RANGES window asked for with ?range=, default "all"."""
+    date_range = request.GET.get("range", "all")
+    return date_range if date_range in CHART_DATE_RANGES else "all"
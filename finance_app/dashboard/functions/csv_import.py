@@ -0,0 +1,104 @@
+import csv
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from ..forms import InvestmentForm, LoanForm
+from ..list_and_dictionaries.statuses import RECOMPUTE_SNAPSHOT
+from .chart_cache import bump_data_version
+from .jobs import enqueue_job
+
+# What can be imported: kind -> form whose fields are the CSV columns and validate them
+CSV_IMPORT_FORMS = {
+    "loans": LoanForm,
+    "investments": InvestmentForm,
+}
+
+
+def import_columns(kind):
+    """Returns the CSV columns of an import kind."""
+    return CSV_IMPORT_FORMS[kind]._meta.fields
+
+
+def clean_row(fields, row):
+    """Validates a CSV row like a bound model form would but without creating one: fields maps
+    each column to its (form field, model field), whose validators (e.g. minimum values) run too.
+    Returns (cleaned values, errors) where errors maps a column to its messages.
+    """
+    values, errors = {}, {}
+    for name, (form_field, model_field) in fields.items():
+        try:
+            value = form_field.clean((row.get(name) or "").strip())
+            model_field.run_validators(value)
+            values[name] = value
+        except ValidationError as error:
+            errors[name] = error.messages
+    return values, errors
+
+
+def _insert(model, objects):
+    # One transaction per batch, so the SQLite write lock is never held for a whole file
+    with transaction.atomic():
+        model.objects.bulk_create(objects)
+
+
+def import_csv(user, kind, lines, on_error, batch_size=None):
+    """Imports the user's loans or investments from CSV lines (an open text file or any iterable
+    of lines), one row at a time: memory use does not depend on the size of the file.
+    Valid rows are inserted in bulk_create batches of batch_size (IMPORT_BATCH_SIZE by default),
+    each in its own transaction. Invalid rows are skipped and reported with
+    on_error(row number, {column: [messages]}), row 1 being the header.
+    An unreadable line (not UTF-8 or not CSV) is reported and ends the import.
+    Returns the number of imported and of skipped rows.
+    """
+    form_class = CSV_IMPORT_FORMS[kind]
+    model = form_class._meta.model
+    fields = {
+        name: (form_class.base_fields[name], model._meta.get_field(name))
+        for name in import_columns(kind)
+    }
+    batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+
+    reader = csv.DictReader(lines)
+    try:
+        columns = reader.fieldnames or []
+    except (UnicodeDecodeError, csv.Error) as error:
+        on_error(1, {"file": [f"Unreadable line: {error}"]})
+        return 0, 0
+    missing = [name for name in fields if name not in columns]
+    if missing:
+        on_error(1, {name: ["This column is missing."] for name in missing})
+        return 0, 0
+
+    imported = skipped = 0
+    batch = []
+    rows = enumerate(reader, start=2)
+    row_number = 1
+    while True:
+        try:
+            row_number, row = next(rows)
+        except StopIteration:
+            break
+        except (UnicodeDecodeError, csv.Error) as error:
+            # The rows before it are still imported
+            on_error(row_number + 1, {"file": [f"Unreadable line: {error}"]})
+            break
+        values, errors = clean_row(fields, row)
+        if errors:
+            on_error(row_number, errors)
+            skipped += 1
+            continue
+        batch.append(model(user_name=user, **values))
+        if len(batch) == batch_size:
+            _insert(model, batch)
+            imported += len(batch)
+            batch = []
+    if batch:
+        _insert(model, batch)
+        imported += len(batch)
+
+    if imported:
+        bump_data_version(user)
+        enqueue_job(user, RECOMPUTE_SNAPSHOT)
+    return imported, skipped
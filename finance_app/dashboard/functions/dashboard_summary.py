@@ -0,0 +1,49 @@
+from asgiref.sync import sync_to_async
+
+from .financial_aggregates import adashboard_totals
+from .line_chart import LineChartBuilder, window_start
+from ..models import NetWorth
+
+# Window of the net worth chart on the dashboard, one of CHART_DATE_RANGES
+DASHBOARD_CHART_RANGE = "30d"
+
+
+async def _recent_net_worth(user):
+    rows = NetWorth.objects.filter(
+        user_name=user, date__gte=window_start(DASHBOARD_CHART_RANGE)
+    ).order_by("date")
+    series = {"x": [], "y": []}
+    async for day, value in rows.values_list("date", "total_net_worth"):
+        series["x"].append(day)
+        series["y"].append(value)
+    return series
+
+
+def _build_net_worth_chart(series):
+    # Pure computation on the fetched series, no database access: safe in any thread
+    return LineChartBuilder(
+        series,
+        {},
+        title="Net Worth, last 30 days",
+        x_axis_label="Date",
+        y_axis_label="Net Worth Value",
+        renderer="svg",
+    ).build_chart()["line_chart"]
+
+
+async def dashboard_summary(user):
+    """Returns the dashboard overview of the user: loan totals, budget count, latest investment
+    and net worth snapshots and an SVG chart of the recent net worth, with two queries.
+    The chart is built in a worker thread.
+    """
+    # The async ORM runs a request's queries one after the other in a single thread,
+    # so they are combined rather than gathered.
+    summary = await adashboard_totals(user)
+    recent_net_worth = await _recent_net_worth(user)
+
+    summary["net_worth_chart"] = None
+    if recent_net_worth["x"]:
+        summary["net_worth_chart"] = await sync_to_async(
+            _build_net_worth_chart, thread_sensitive=False
+        )(recent_net_worth)
+    return summary
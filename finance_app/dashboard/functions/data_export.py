@@ -0,0 +1,121 @@
+import csv
+import gzip
+import io
+import json
+import os
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+
+from ..models import Budget, Investment, InvestmentsThroughTime, Loans, NetWorth
+
+# What a user's export holds: table -> (model, values_list lookups, ordering).
+# Budgets are joined to their allocations, so a budget has a row per category
+# (and one row with empty category columns when it has none).
+EXPORT_TABLES = {
+    "budgets": (
+        Budget,
+        (
+            "budget_name",
+            "amount",
+            "allocations__category_name",
+            "allocations__percentage",
+        ),
+        ("pk", "allocations__pk"),
+    ),
+    "loans": (Loans, ("loan_name", "amount", "interest_rate", "due_date"), ("pk",)),
+    "investments": (
+        Investment,
+        ("investment_name", "amount", "category_name"),
+        ("pk",),
+    ),
+    "investments_through_time": (InvestmentsThroughTime, ("date", "amount"), ("date",)),
+    "net_worth": (NetWorth, ("date", "total_net_worth"), ("date",)),
+}
+
+# Export format -> (content type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+
+
+def export_querysets(user):
+    """Yields (table, columns, queryset of value tuples) for every table of EXPORT_TABLES.
+    The querysets are lazy: nothing is read until they are iterated.
+    """
+    for table, (model, lookups, ordering) in EXPORT_TABLES.items():
+        columns = [lookup.split("__")[-1] for lookup in lookups]
+        queryset = (
+            model.objects.filter(user_name=user)
+            .order_by(*ordering)
+            .values_list(*lookups)
+        )
+        yield table, columns, queryset
+
+
+def format_header(export_format, table, columns):
+    """Returns the text starting a table: a header row in CSV, nothing in NDJSON."""
+    if export_format != "csv":
+        return ""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(["table", *columns])
+    return buffer.getvalue()
+
+
+def format_rows(export_format, table, columns, rows):
+    """Returns a chunk of rows as text: CSV rows whose first column names the table,
+    or one JSON object per line with a "table" key.
+    """
+    if export_format == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows((table, *row) for row in rows)
+        return buffer.getvalue()
+    return "".join(
+        json.dumps({"table": table, **dict(zip(columns, row))}, cls=DjangoJSONEncoder)
+        + "\n"
+        for row in rows
+    )
+
+
+def export_chunks(user, export_format, chunk_size=None):
+    """Yields the user's export as text chunks of chunk_size rows (EXPORT_CHUNK_SIZE by default).
+    Rows are read with QuerySet.iterator(), so only one chunk is held in memory at a time.
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    for table, columns, queryset in export_querysets(user):
+        yield format_header(export_format, table, columns)
+        rows = queryset.iterator(chunk_size=chunk_size)
+        while chunk := list(islice(rows, chunk_size)):
+            yield format_rows(export_format, table, columns, chunk)
+
+
+async def aexport_chunks(user, export_format, chunk_size=None):
+    """export_chunks() for ASGI responses. Each chunk of rows is read in one sync_to_async() call,
+    rather than with QuerySet.aiterator(), which runs values_list() queries in the event loop.
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    for table, columns, queryset in export_querysets(user):
+        yield format_header(export_format, table, columns)
+        rows = queryset.iterator(chunk_size=chunk_size)  # Queries on its first next()
+        while chunk := await sync_to_async(list)(islice(rows, chunk_size)):
+            yield format_rows(export_format, table, columns, chunk)
+
+
+def export_file_name(user, export_format):
+    return f"{user.username}.{EXPORT_FORMATS[export_format][1]}.gz"
+
+
+def export_user_to_file(user_id, export_format, directory):
+    """Writes a user's export to a gzip file in directory and returns its path.
+    Runs in the export_user_data worker processes, so it takes a user id rather than a user.
+    """
+    user = get_user_model().objects.get(pk=user_id)
+    path = os.path.join(directory, export_file_name(user, export_format))
+    with gzip.open(path, "wt", encoding="utf-8", newline="") as file:
+        for chunk in export_chunks(user, export_format):
+            file.write(chunk)
+    return path
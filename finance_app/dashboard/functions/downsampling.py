@@ -0,0 +1,72 @@
+import numpy as np
+
+
+def lttb_indices(x, y, max_points):
+    """Largest-Triangle-Three-Buckets: returns the indices of at most max_points points keeping the visual shape.
+    x must be increasing. Each bucket is scored with one vectorized triangle-area computation.
+    """
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # First and last points are always kept, the rest is split into max_points - 2 buckets.
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    indices = np.empty(max_points, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+
+    previous = 0
+    for bucket in range(max_points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # Average of the next bucket (or the last point) is the third vertex of the triangle.
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_start = end if end < next_end else n - 1
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        areas = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(areas.argmax())
+        indices[bucket + 1] = previous
+    return indices
+
+
+def min_max_indices(y, max_points):
+    """Min/max bucketing: returns the indices of the lowest and highest point of max_points // 2 equal buckets.
+    Fully vectorized, cheaper than LTTB and keeps every extreme (spikes and drops).
+    """
+    n = len(y)
+    if max_points >= n or max_points < 2:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=np.float64)
+    bucket_count = max_points // 2
+    buckets = np.arange(n) * bucket_count // n
+    # Sorted by bucket then by value: the first item of each bucket is its minimum and the last its maximum.
+    order = np.lexsort((y, buckets))
+    starts = np.searchsorted(buckets[order], np.arange(bucket_count))
+    ends = np.append(starts[1:], n) - 1
+    return np.unique(np.concatenate((order[starts], order[ends])))
+
+
+DOWNSAMPLING_METHODS = {
+    "lttb": lambda x, y, max_points: lttb_indices(x, y, max_points),
+    "minmax": lambda x, y, max_points: min_max_indices(y, max_points),
+}
+
+
+def downsample_series(series, max_points, method="lttb"):
+    """Reduces a {'x': dates, 'y': values} series to at most max_points points."""
+    if max_points is None or len(series["x"]) <= max_points:
+        return series
+
+    x = np.fromiter((day.toordinal() for day in series["x"]), dtype=np.float64)
+    y = np.asarray(series["y"], dtype=np.float64)
+    indices = DOWNSAMPLING_METHODS[method](x, y, max_points)
+    return {
+        "x": [series["x"][i] for i in indices],
+        "y": [series["y"][i] for i in indices],
+    }
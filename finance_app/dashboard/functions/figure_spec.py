@@ -0,0 +1,165 @@
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+# Parts of Plotly's built-in templates the charts rely on, so figures can be written as plain
+# dictionaries instead of validated plotly Figure objects (and without building a DataFrame).
+COLORWAY = [
+    "#636efa",
+    "#EF553B",
+    "#00cc96",
+    "#ab63fa",
+    "#FFA15A",
+    "#19d3f3",
+    "#FF6692",
+    "#B6E880",
+    "#FF97FF",
+    "#FECB52",
+]
+TEMPLATE_LAYOUT = {
+    "autotypenumbers": "strict",
+    "colorway": COLORWAY,
+    "font": {"color": "#2a3f5f"},
+    "hoverlabel": {"align": "left"},
+    "hovermode": "closest",
+    "paper_bgcolor": "white",
+    "title": {"x": 0.05},
+}
+PLOTLY_WHITE_AXIS = {
+    "automargin": True,
+    "gridcolor": "#EBF0F8",
+    "linecolor": "#EBF0F8",
+    "ticks": "",
+    "title": {"standoff": 15},
+    "zerolinecolor": "#EBF0F8",
+    "zerolinewidth": 2,
+}
+PLOTLY_WHITE_LAYOUT = {
+    **TEMPLATE_LAYOUT,
+    "plot_bgcolor": "white",
+    "xaxis": PLOTLY_WHITE_AXIS,
+    "yaxis": PLOTLY_WHITE_AXIS,
+}
+
+# Shading of the band around a line, e.g. the percentile range of a projection
+BAND_FILL_COLOR = "rgba(99, 110, 250, 0.2)"
+
+# Characters escaped in the JSON so it can be embedded in a <script> element
+_SCRIPT_ESCAPES = {ord("<"): "\\u003c", ord(">"): "\\u003e", ord("&"): "\\u0026"}
+
+
+def merge_layout(*layouts):
+    """Deep-merges layout dictionaries, later ones winning."""
+    merged = {}
+    for layout in layouts:
+        for key, value in layout.items():
+            if isinstance(value, dict) and isinstance(merged.get(key), dict):
+                value = merge_layout(merged[key], value)
+            merged[key] = value
+    return merged
+
+
+def line_trace(x, y):
+    """Returns the scatter trace px.line(x=x, y=y, markers=True) would create."""
+    return {
+        "type": "scatter",
+        "mode": "lines+markers",
+        "x": x,
+        "y": y,
+        "line": {"color": COLORWAY[0], "dash": "solid"},
+        "marker": {"symbol": "circle"},
+        "hovertemplate": "x=%{x}<br>y=%{y}<extra></extra>",
+        "name": "",
+        "showlegend": False,
+    }
+
+
+def band_traces(x, lower, upper):
+    """Returns the two line-less scatter traces shading the area between lower and upper.
+    Plotly fills the second trace down to the first one ("tonexty").
+    """
+    band = {
+        "type": "scatter",
+        "mode": "lines",
+        "x": x,
+        "line": {"width": 0},
+        "hoverinfo": "skip",
+        "showlegend": False,
+    }
+    return [
+        {**band, "y": lower},
+        {**band, "y": upper, "fill": "tonexty", "fillcolor": BAND_FILL_COLOR},
+    ]
+
+
+def pie_trace(labels, values):
+    """Returns a pie trace showing labels with their percentages."""
+    return {
+        "type": "pie",
+        "labels": labels,
+        "values": values,
+        "hoverinfo": "label+percent+value",
+        "textinfo": "label+percent",
+        "automargin": True,
+    }
+
+
+def line_figure(x, y, layout, band=None):
+    """Returns a line chart figure styled with the plotly_white template.
+    band is an optional (lower, upper) pair of y values shaded behind the line.
+    """
+    data = [line_trace(x, y)]
+    if band is not None:
+        data = band_traces(x, *band) + data
+    return {
+        "data": data,
+        "layout": merge_layout(
+            PLOTLY_WHITE_LAYOUT, {"margin": {"t": 60}, "showlegend": False}, layout
+        ),
+    }
+
+
+def pie_figure(labels, values, layout):
+    """Returns a pie chart figure styled with the default plotly template."""
+    return {
+        "data": [pie_trace(labels, values)],
+        "layout": merge_layout(TEMPLATE_LAYOUT, layout),
+    }
+
+
+def _encode(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if hasattr(value, "tolist"):  # NumPy arrays and scalars
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def to_json(value):
+    """Compact JSON of a figure (or any part of it), safe to embed in a <script> element."""
+    return json.dumps(value, separators=(",", ":"), default=_encode).translate(
+        _SCRIPT_ESCAPES
+    )
+
+
+def render_figure(figure):
+    """Renders a figure as a div holding only the figure JSON, like plotly.offline.plot(include_plotlyjs=False).
+    plotly.js itself is loaded once per page from STATIC_URL (see the `plotly_js_url` template tag).
+    """
+    div_id = str(uuid.uuid4())
+    layout = figure["layout"]
+    style = "; ".join(
+        f"{dimension}:{layout[dimension]}px"
+        for dimension in ("height", "width")
+        if dimension in layout
+    )
+    return (
+        f'<div><div id="{div_id}" class="plotly-graph-div" style="{style}"></div>'
+        f'<script type="text/javascript">'
+        f'if (document.getElementById("{div_id}")) {{'
+        f'Plotly.newPlot("{div_id}", {to_json(figure["data"])}, {to_json(layout)}, {{"responsive": true}})'
+        f"}};</script></div>"
+    )
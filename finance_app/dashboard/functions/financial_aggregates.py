@@ -0,0 +1,184 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db.models import (
+    Count,
+    DecimalField,
+    F,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce
+
+from ..models import Budget, Investment, InvestmentsThroughTime, Loans, NetWorth
+
+ZERO = Decimal("0.00")
+CENTS = Decimal("0.01")
+
+MONEY_FIELD = DecimalField(max_digits=17, decimal_places=2)
+# amount (2 places) times interest_rate (2 places)
+WEIGHTED_RATE_FIELD = DecimalField(max_digits=22, decimal_places=4)
+
+
+def _loan_summary_aggregates():
+    return dict(
+        total_amount=Coalesce(Sum("amount"), Value(ZERO), output_field=MONEY_FIELD),
+        loan_count=Count("id"),
+        weighted_interest=Coalesce(
+            Sum(F("amount") * F("interest_rate"), output_field=WEIGHTED_RATE_FIELD),
+            Value(ZERO),
+            output_field=WEIGHTED_RATE_FIELD,
+        ),
+    )
+
+
+def _finish_loan_summary(summary):
+    # SQLite hands sums back with float noise, so round them to cents here.
+    total_amount = summary["total_amount"].quantize(CENTS)
+    weighted_interest = summary.pop("weighted_interest")
+    summary["total_amount"] = total_amount
+    summary["average_interest_rate"] = (
+        (weighted_interest / total_amount).quantize(CENTS) if total_amount else ZERO
+    )
+    return summary
+
+
+def loan_summary(user):
+    """Returns the totals of the user's loans computed with a single aggregate query:
+    {'total_amount', 'loan_count', 'average_interest_rate'} where the interest rate is weighted by amount.
+    """
+    return _finish_loan_summary(
+        Loans.objects.filter(user_name=user).aggregate(**_loan_summary_aggregates())
+    )
+
+
+async def aloan_summary(user):
+    """Async version of loan_summary()."""
+    return _finish_loan_summary(
+        await Loans.objects.filter(user_name=user).aaggregate(
+            **_loan_summary_aggregates()
+        )
+    )
+
+
+def _per_user(queryset, expression):
+    """Scalar subquery of an aggregate over the queryset's rows of the outer user, NULL without rows."""
+    return Subquery(
+        queryset.filter(user_name=OuterRef("pk"))
+        .values("user_name")
+        .annotate(value=expression)
+        .values("value")
+    )
+
+
+def _latest(model, field):
+    return Subquery(
+        model.objects.filter(user_name=OuterRef("pk"))
+        .order_by("-date")
+        .values(field)[:1]
+    )
+
+
+async def adashboard_totals(user):
+    """Returns the user's loan summary (see loan_summary), budget count and latest portfolio and
+    net worth snapshots ({'amount' or 'total_net_worth', 'date'}, None when there is none)
+    with a single query of correlated subqueries.
+    """
+    totals = await (
+        get_user_model()
+        .objects.filter(pk=user.pk)
+        .values(
+            **{
+                name: _per_user(Loans.objects, aggregate)
+                for name, aggregate in _loan_summary_aggregates().items()
+            },
+            budget_count=_per_user(Budget.objects, Count("id")),
+            investments_amount=_latest(InvestmentsThroughTime, "amount"),
+            investments_date=_latest(InvestmentsThroughTime, "date"),
+            net_worth_amount=_latest(NetWorth, "total_net_worth"),
+            net_worth_date=_latest(NetWorth, "date"),
+        )
+        .aget()
+    )
+    loans = _finish_loan_summary(
+        {
+            "total_amount": totals["total_amount"] or ZERO,
+            "loan_count": totals["loan_count"] or 0,
+            "weighted_interest": totals["weighted_interest"] or ZERO,
+        }
+    )
+    # Subquery values come back from SQLite with float noise, like sums
+    latest_investments = latest_net_worth = None
+    if totals["investments_date"] is not None:
+        latest_investments = {
+            "amount": totals["investments_amount"].quantize(CENTS),
+            "date": totals["investments_date"],
+        }
+    if totals["net_worth_date"] is not None:
+        latest_net_worth = {
+            "total_net_worth": totals["net_worth_amount"].quantize(CENTS),
+            "date": totals["net_worth_date"],
+        }
+    return {
+        "loans": loans,
+        "budget_count": totals["budget_count"] or 0,
+        "latest_investments": latest_investments,
+        "latest_net_worth": latest_net_worth,
+    }
+
+
+def investment_totals_by_category(user):
+    """Returns the sum and count of the user's investments per category, largest first, in a single query."""
+    totals = list(
+        Investment.objects.filter(user_name=user)
+        .values("category_name")
+        .annotate(total_amount=Sum("amount"), investment_count=Count("id"))
+        .order_by("-total_amount")
+    )
+    for category in totals:
+        category["total_amount"] = category["total_amount"].quantize(CENTS)
+    return totals
+
+
+def annotate_net_worth(users):
+    """Annotates a User queryset with loans_total, investments_value and current_net_worth (all Decimal).
+    investments_value is the latest portfolio snapshot, so one query covers any number of users.
+    """
+    loans_total = (
+        Loans.objects.filter(user_name=OuterRef("pk"))
+        .values("user_name")
+        .annotate(total=Sum("amount"))
+        .values("total")
+    )
+    latest_investments = (
+        InvestmentsThroughTime.objects.filter(user_name=OuterRef("pk"))
+        .order_by("-date", "-id")
+        .values("amount")[:1]
+    )
+    return users.annotate(
+        loans_total=Coalesce(
+            Subquery(loans_total, output_field=MONEY_FIELD),
+            Value(ZERO),
+            output_field=MONEY_FIELD,
+        ),
+        investments_value=Coalesce(
+            Subquery(latest_investments, output_field=MONEY_FIELD),
+            Value(ZERO),
+            output_field=MONEY_FIELD,
+        ),
+    ).annotate(
+        # "net_worth" is taken by the reverse relation of the NetWorth model
+        current_net_worth=F("investments_value") - F("loans_total"),
+    )
+
+
+def calculate_net_worth(user):
+    """Returns the user's current net worth as a Decimal with a single query."""
+    net_worth = (
+        annotate_net_worth(get_user_model().objects.filter(pk=user.pk))
+        .values_list("current_net_worth", flat=True)
+        .get()
+    )
+    return Decimal(net_worth).quantize(CENTS)
@@ -0,0 +1,125 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from ..list_and_dictionaries.statuses import (
+    CHART_DATE_RANGES,
+    JOB_FAILED,
+    JOB_PENDING,
+    JOB_RUNNING,
+    PRERENDER_CHARTS,
+    RECOMPUTE_SNAPSHOT,
+)
+from ..models import Job
+from .financial_aggregates import investment_totals_by_category
+from .line_chart import SNAPSHOT_LINE_CHARTS, cached_snapshot_line_chart
+from .net_worth import record_net_worth_snapshot
+from .pieChart import cached_budget_pie_chart
+from .projection import cached_projection_chart
+
+logger = logging.getLogger(__name__)
+
+
+def recompute_snapshot(job):
+    """Stores the user's net worth snapshot for the day the job was queued, then queues the
+    pre-rendering of their charts. No data version bump: the line charts are keyed on the
+    snapshots themselves (see cached_snapshot_line_chart), and a bump made in the worker would
+    not reach a per-process chart cache anyway.
+    """
+    user = job.user_name
+    # System local time, like the date.today() of the views that queue the job
+    snapshot_date = job.created_at.astimezone().date()
+    record_net_worth_snapshot(user, snapshot_date)
+    enqueue_job(user, PRERENDER_CHARTS)
+
+
+def prerender_charts(job):
+    """Builds the user's budget pie charts and portfolio projection (and SVG line charts, when charts
+    are rendered as SVG) into the chart cache, so the next page view is a cache hit. Only worth it when the chart cache
+    is shared between processes (FINANCE_APP_CHART_CACHE_DIR).
+    """
+    user = job.user_name
+    renderer = settings.CHART_RENDERER
+    for budget in user.budgets.prefetch_related("allocations"):
+        cached_budget_pie_chart(user, budget, renderer)
+    investment_totals = investment_totals_by_category(user)
+    if investment_totals:
+        cached_projection_chart(user, investment_totals, renderer)
+    if renderer == "svg":
+        for model in SNAPSHOT_LINE_CHARTS:
+            for date_range in CHART_DATE_RANGES:
+                cached_snapshot_line_chart(user, model, date_range)
+
+
+JOB_HANDLERS = {
+    RECOMPUTE_SNAPSHOT: recompute_snapshot,
+    PRERENDER_CHARTS: prerender_charts,
+}
+
+
+def enqueue_job(user, kind):
+    """Queues a job of the user with a single INSERT, unless the same job is already waiting.
+    A running job does not count, it may have read the data before the change being queued for.
+    With JOBS_RUN_EAGERLY the job runs right away instead, for development without a worker.
+    """
+    if settings.JOBS_RUN_EAGERLY:
+        JOB_HANDLERS[kind](Job(user_name=user, kind=kind, created_at=timezone.now()))
+        return
+    # The unique_pending_job_per_user constraint turns a duplicate into a no-op
+    Job.objects.bulk_create([Job(user_name=user, kind=kind)], ignore_conflicts=True)
+
+
+def claim_jobs(limit):
+    """Marks up to limit of the oldest pending jobs as running and returns their ids.
+    The transaction takes the SQLite write lock when it begins (transaction_mode IMMEDIATE),
+    so two workers never claim the same job.
+    """
+    with transaction.atomic():
+        job_ids = list(
+            Job.objects.filter(status=JOB_PENDING).values_list("pk", flat=True)[:limit]
+        )
+        Job.objects.filter(pk__in=job_ids).update(
+            status=JOB_RUNNING, started_at=timezone.now()
+        )
+    return job_ids
+
+
+def run_job(job_id):
+    """Runs a claimed job. Finished jobs are deleted; failed ones are kept with their traceback.
+    Returns whether the job succeeded.
+    """
+    job = Job.objects.select_related("user_name").get(pk=job_id)
+    try:
+        JOB_HANDLERS[job.kind](job)
+    except Exception:
+        logger.exception("Job %s (%s) failed", job.pk, job.kind)
+        Job.objects.filter(pk=job.pk).update(
+            status=JOB_FAILED, finished_at=timezone.now(), error=traceback.format_exc()
+        )
+        return False
+    job.delete()
+    return True
+
+
+def requeue_stale_jobs():
+    """Fails the jobs that have been running for longer than JOB_TIMEOUT (their worker died)
+    and queues them again. Returns the number of requeued jobs.
+    """
+    stale = Job.objects.filter(
+        status=JOB_RUNNING,
+        started_at__lt=timezone.now() - timedelta(seconds=settings.JOB_TIMEOUT),
+    )
+    with transaction.atomic():
+        jobs = list(stale)
+        stale.filter(pk__in=[job.pk for job in jobs]).update(
+            status=JOB_FAILED, finished_at=timezone.now(), error="Worker timed out."
+        )
+        Job.objects.bulk_create(
+            [Job(user_name_id=job.user_name_id, kind=job.kind) for job in jobs],
+            ignore_conflicts=True,
+        )
+    return len(jobs)
@@ -1,5 +1,50 @@
-import plotly.express as px
-import plotly.offline as opy
+from datetime import date, timedelta
+
+from django.db.models import Count, Max, Min, Sum
+
+from .chart_cache import get_or_build_chart
+from .chart_renderers import render_chart
+from .figure_spec import PLOTLY_WHITE_LAYOUT, line_figure, merge_layout
+from .request_timing import measure
+from .rollups import ROLLUPS, choose_rollup_period, period_start, rollup_queryset
+from ..list_and_dictionaries.statuses import CHART_DATE_RANGES
+from ..models import InvestmentsThroughTime, NetWorth
+
+# Upper bound of points sent to a chart; longer histories are downsampled.
+DEFAULT_MAX_POINTS = 500
+
+# Title and y axis label of the line chart of each snapshot model
+SNAPSHOT_LINE_CHARTS = {
+    NetWorth: ("Net Worth Over Time", "Net Worth Value"),
+    InvestmentsThroughTime: ("Investments Over Time", "Investment Value"),
+}
+
+
+def line_chart_layout(title=None, x_axis_label=None, y_axis_label=None):
+    """Returns the Plotly layout shared by server-built and browser-built line charts.
+    It carries the plotly_white styling, since the figures do not embed Plotly templates.
+    """
+    return merge_layout(
+        PLOTLY_WHITE_LAYOUT,
+        dict(
+            title=dict(text=title),
+            width=600,
+            height=600,
+            font=dict(size=20, color="black", family="Arial, sans-serif"),
+            xaxis=dict(
+                title=dict(text=x_axis_label),
+                showgrid=True,
+                gridcolor="LightGray",
+                tickangle=45,
+            ),
+            yaxis=dict(
+                title=dict(text=y_axis_label),
+                showgrid=True,
+                gridcolor="LightGray",
+            ),
+            plot_bgcolor="white",
+        ),
+    )
 
 
 class LineChartBuilder:
@@ -7,67 +52,188 @@ class LineChartBuilder:
     Data format:
     {
         'x': [list of x values],
-        'y': [list of y values]
+        'y': [list of y values],
+        'lower': [optional lower bound of a band around the line],
+        'upper': [optional upper bound of the band],
     }
     This class is used to build a line chart with specified title, x-axis label, and y-axis label.
     """
 
-    def __init__(self, data, context, title=None, x_axis_label=None, y_axis_label=None):
+    def __init__(
+        self,
+        data,
+        context,
+        title=None,
+        x_axis_label=None,
+        y_axis_label=None,
+        renderer=None,
+    ):
         self.title = title
         self.x_axis_label = x_axis_label
         self.y_axis_label = y_axis_label
         self.data = data
         self.context = context
+        self.renderer = renderer
 
+    @measure("chart")
     def build_chart(self):
-        """Builds the line chart using Plotly Express."""
-        fig = px.line(
-            x=self.data["x"],
-            y=self.data["y"],
-            title=self.title,
-            labels={"x": self.x_axis_label, "y": self.y_axis_label},
-            markers=True,
+        """Builds the line chart figure straight from the x and y lists (or NumPy arrays)."""
+        band = (
+            (self.data["lower"], self.data["upper"]) if "upper" in self.data else None
         )
-
-        # Set layout properties
-        fig.update_layout(
-            width=600,
-            height=600,
-            font=dict(size=20, color="black", family="Arial, sans-serif"),
-            template="plotly_white",
-            xaxis=dict(
-                showgrid=True,
-                gridcolor="LightGray",
-                tickangle=45,
-            ),
-            yaxis=dict(
-                showgrid=True,
-                gridcolor="LightGray",
-            ),
-            plot_bgcolor="white",
+        fig = line_figure(
+            self.data["x"],
+            self.data["y"],
+            line_chart_layout(self.title, self.x_axis_label, self.y_axis_label),
+            band,
         )
 
-        self.context["line_chart"] = opy.plot(fig, auto_open=False, output_type="div")
+        self.context["line_chart"] = render_chart(fig, self.renderer)
         return self.context
 
 
-def create_line_chart(
-    context, qs, fields, title, x_axis_label="Date", y_axis_label="Value"
-):
-    """Function to create a line chart from a queryset by transforming queryset to the dictionary of keys 'X' and 'Y'."""
+def window_start(date_range):
+    """Returns the first day of a CHART_DATE_RANGES window, or None for the whole history."""
+    days = CHART_DATE_RANGES[date_range]
+    return date.today() - timedelta(days=days) if days is not None else None
+
+
+def snapshot_signature(model, user, date_range="all"):
+    """Returns the count, first and last dates and sum of the user's daily snapshots in date_range,
+    in one aggregate query. Any write to the window changes it, whichever process made the write,
+    so it keys the cached line charts and the ETags of the series endpoints.
+    """
+    qs = model.objects.filter(user_name=user)
+    start = window_start(date_range)
+    if start is not None:
+        qs = qs.filter(date__gte=start)
+    return qs.aggregate(
+        count=Count("id"),
+        first_date=Min("date"),
+        last_date=Max("date"),
+        total=Sum(ROLLUPS[model][1]),
+    )
+
+
+def series_from_queryset(qs, fields, max_points=None):
+    """Transforms a queryset into the columnar dictionary of keys 'x' and 'y' with a single values_list query.
+    fields[0] must be the date field. The result is downsampled to at most max_points points.
+    """
 
     data = list(qs.values_list(*fields))
-    chart_data = {
+    series = {
         "x": [d[0] for d in data],
         "y": [d[1] for d in data],
     }
+    if max_points is None or len(data) <= max_points:
+        return series
+
+    from .downsampling import downsample_series  # numpy, only needed for long histories
+
+    return downsample_series(series, max_points)
+
+
+def snapshot_series(
+    model,
+    user,
+    date_range="all",
+    max_points=DEFAULT_MAX_POINTS,
+    first_date=None,
+    last_date=None,
+    count=None,
+):
+    """Returns the user's series of a snapshot model (NetWorth or InvestmentsThroughTime) in date_range.
+    The daily rows are read when they fit in max_points, longer ranges from the finest rollup that does
+    (see choose_rollup_period); anything still above max_points is downsampled. The first and last dates
+    and the number of the daily snapshots in the window are queried unless given.
+    """
+    qs = model.objects.filter(user_name=user).order_by("date")
+    start = window_start(date_range)
+    if start is not None:
+        qs = qs.filter(date__gte=start)
+    if first_date is None or last_date is None or count is None:
+        bounds = qs.aggregate(
+            first_date=Min("date"), last_date=Max("date"), count=Count("id")
+        )
+        first_date, last_date = bounds["first_date"], bounds["last_date"]
+        count = bounds["count"]
+        if last_date is None:
+            return {"x": [], "y": []}
+
+    start = start or first_date
+    period = choose_rollup_period(count, (last_date - start).days, max_points)
+    if period is None:
+        # The window is already applied to qs
+        return series_from_queryset(
+            qs, ["date", ROLLUPS[model][1]], max_points=max_points
+        )
+    rollups = rollup_queryset(model, user, period).filter(
+        period_start__gte=period_start(start, period)
+    )
+    return series_from_queryset(
+        rollups, ["period_start", "close"], max_points=max_points
+    )
+
+
+def create_snapshot_line_chart(
+    context,
+    model,
+    user,
+    title,
+    x_axis_label="Date",
+    y_axis_label="Value",
+    date_range="all",
+    renderer=None,
+    signature=None,
+):
+    """Creates a line chart of a snapshot model, read like the JSON series endpoints read it (see snapshot_series).
+    A snapshot_signature() of the window saves snapshot_series its aggregate query.
+    """
+    if signature is None:
+        signature = snapshot_signature(model, user, date_range)
+    if not signature["count"]:
+        data = {"x": [], "y": []}
+    else:
+        data = snapshot_series(
+            model,
+            user,
+            date_range,
+            first_date=signature["first_date"],
+            last_date=signature["last_date"],
+            count=signature["count"],
+        )
 
     chart = LineChartBuilder(
-        data=chart_data,
+        data=data,
         context=context,
         title=title,
         x_axis_label=x_axis_label,
         y_axis_label=y_axis_label,
+        renderer=renderer,
     )
 
     return chart.build_chart()
+
+
+def cached_snapshot_line_chart(user, model, date_range="all"):
+    """Returns the SVG line chart of a snapshot model from the chart cache, building it on a miss.
+    The chart is keyed on the snapshot signature rather than on the data version alone: snapshots
+    are also written by the job worker and the management commands, whose data version bumps do not
+    reach a per-process chart cache. Plotly line charts are not cached: the browser builds them
+    from the JSON series endpoints.
+    """
+    title, y_axis_label = SNAPSHOT_LINE_CHARTS[model]
+    signature = snapshot_signature(model, user, date_range)
+
+    def build_line_chart():
+        return create_snapshot_line_chart(
+            {}, model, user, title, "Date", y_axis_label, date_range, "svg", signature
+        )["line_chart"]
+
+    return get_or_build_chart(
+        user,
+        f"{model._meta.model_name}_line.svg",
+        f"{date_range}-{window_start(date_range)}-{signature['count']}-"
+        f"{signature['last_date']}-{signature['total']}",
+        build_line_chart,
+    )
@@ -0,0 +1,177 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+from .request_timing import LATENCY_BUCKETS_MS, QUERY_COUNT_BUCKETS
+
+# name -> (type, help)
+METRICS = {
+    "finance_app_request_duration_seconds": (
+        "histogram",
+        "Request latency by URL name.",
+    ),
+    "finance_app_request_queries": (
+        "histogram",
+        "Database queries per request by URL name.",
+    ),
+    "finance_app_db_writes_total": (
+        "counter",
+        "INSERT, UPDATE and DELETE statements by URL name.",
+    ),
+    "finance_app_chart_cache_requests_total": (
+        "counter",
+        "Chart cache lookups by chart and result.",
+    ),
+    "finance_app_chart_cache_hit_ratio": (
+        "gauge",
+        "Share of chart cache lookups served from the cache.",
+    ),
+}
+LATENCY_BUCKETS_SECONDS = [bucket / 1000 for bucket in LATENCY_BUCKETS_MS]
+NO_BUCKET = -1.0
+
+# Deltas not yet written to the shared store: (sample name, labels, le) -> value
+_pending = defaultdict(float)
+_pending_lock = threading.Lock()
+_last_flush = time.monotonic()
+_store = threading.local()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return ",".join(
+        f'{key}="{_escape(value)}"' for key, value in sorted(labels.items())
+    )
+
+
+def increment(name, amount=1, **labels):
+    """Adds amount to a counter."""
+    with _pending_lock:
+        _pending[(name, _labels(**labels), NO_BUCKET)] += amount
+
+
+def observe(name, value, buckets, **labels):
+    """Adds an observation to a histogram with cumulative buckets, Prometheus style."""
+    label_text = _labels(**labels)
+    with _pending_lock:
+        for bucket in [*buckets, math.inf]:
+            _pending[(f"{name}_bucket", label_text, bucket)] += value <= bucket
+        _pending[(f"{name}_sum", label_text, NO_BUCKET)] += value
+        _pending[(f"{name}_count", label_text, NO_BUCKET)] += 1
+
+
+def record_request(url_name, total_seconds, timings):
+    """Adds a finished request (see request_timing.RequestTimings) to the metrics."""
+    observe(
+        "finance_app_request_duration_seconds",
+        total_seconds,
+        LATENCY_BUCKETS_SECONDS,
+        url_name=url_name,
+    )
+    observe(
+        "finance_app_request_queries",
+        timings.query_count,
+        QUERY_COUNT_BUCKETS,
+        url_name=url_name,
+    )
+    if timings.write_count:
+        increment("finance_app_db_writes_total", timings.write_count, url_name=url_name)
+    if time.monotonic() - _last_flush >= settings.METRICS_FLUSH_INTERVAL:
+        flush()
+
+
+def _connection():
+    """One connection to the node-wide metrics store per thread (and per process after a fork)."""
+    connection = getattr(_store, "connection", None)
+    if (
+        connection is None
+        or _store.pid != os.getpid()
+        or _store.path != settings.METRICS_DATABASE
+    ):
+        connection = sqlite3.connect(
+            settings.METRICS_DATABASE, timeout=5, isolation_level=None
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS samples (name TEXT NOT NULL, labels TEXT NOT NULL, "
+            "le REAL NOT NULL, value REAL NOT NULL, PRIMARY KEY (name, labels, le))"
+        )
+        _store.connection, _store.pid = connection, os.getpid()
+        _store.path = settings.METRICS_DATABASE
+    return connection
+
+
+def flush():
+    """Adds this process's pending deltas to the shared store, so any worker can serve the node's totals."""
+    global _last_flush
+    with _pending_lock:
+        deltas = list(_pending.items())
+        _pending.clear()
+        _last_flush = time.monotonic()
+    if not deltas:
+        return
+
+    connection = _connection()
+    connection.execute("BEGIN IMMEDIATE")
+    connection.executemany(
+        "INSERT INTO samples (name, labels, le, value) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (name, labels, le) DO UPDATE SET value = value + excluded.value",
+        [(name, labels, le, value) for (name, labels, le), value in deltas],
+    )
+    connection.execute("COMMIT")
+
+
+def _format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def render_prometheus():
+    """Returns the metrics of every worker on this node in the Prometheus text format."""
+    flush()
+    rows = (
+        _connection()
+        .execute(
+            "SELECT name, labels, le, value FROM samples ORDER BY name, labels, le"
+        )
+        .fetchall()
+    )
+
+    samples = defaultdict(list)
+    cache_lookups = defaultdict(dict)
+    for name, labels, le, value in rows:
+        family = (
+            name.rsplit("_", 1)[0]
+            if name.endswith(("_bucket", "_sum", "_count"))
+            else name
+        )
+        if le != NO_BUCKET:
+            le_text = "+Inf" if math.isinf(le) else _format_value(le)
+            labels = f'{labels},le="{le_text}"' if labels else f'le="{le_text}"'
+        samples[family].append(f"{name}{{{labels}}} {_format_value(value)}")
+        if name == "finance_app_chart_cache_requests_total":
+            chart = labels.split('chart="', 1)[1].split('"', 1)[0]
+            result = "hit" if 'result="hit"' in labels else "miss"
+            cache_lookups[chart][result] = value
+
+    for chart, lookups in sorted(cache_lookups.items()):
+        hits = lookups.get("hit", 0)
+        ratio = hits / (hits + lookups.get("miss", 0))
+        samples["finance_app_chart_cache_hit_ratio"].append(
+            f'finance_app_chart_cache_hit_ratio{{chart="{chart}"}} {_format_value(ratio)}'
+        )
+
+    lines = []
+    for family, (metric_type, help_text) in METRICS.items():
+        if samples[family]:
+            lines.append(f"# HELP {family} {help_text}")
+            lines.append(f"# TYPE {family} {metric_type}")
+            lines.extend(samples[family])
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,70 @@
+import math
+
+import numpy as np
+
+# This module only needs NumPy, so process pool workers can import it without setting Django up.
+
+
+def monthly_log_returns(annual_return, annual_volatility):
+    """Returns the mean and standard deviation of the monthly log return of a lognormal
+    (geometric Brownian motion) model whose expected annual return is annual_return.
+    """
+    volatility = annual_volatility / math.sqrt(12)
+    drift = math.log1p(annual_return) / 12 - volatility**2 / 2
+    return drift, volatility
+
+
+def simulate_chunk(amounts, drifts, volatilities, months, paths, seed, chunk):
+    """Simulates `paths` monthly paths of a portfolio holding `amounts` in independent categories
+    and returns their total values, an array of paths x (months + 1) starting at today's value.
+    Each chunk draws from its own stream (seed, chunk), so results do not depend on which process runs it.
+    """
+    rng = np.random.default_rng([seed, chunk])
+    totals = np.zeros((paths, months + 1))
+    totals[:, 0] = sum(amounts)
+    for amount, drift, volatility in zip(amounts, drifts, volatilities):
+        log_returns = rng.normal(drift, volatility, size=(paths, months))
+        totals[:, 1:] += amount * np.exp(np.cumsum(log_returns, axis=1))
+    return totals
+
+
+def simulate_portfolio(
+    amounts,
+    assumptions,
+    months,
+    paths,
+    percentiles,
+    seed=0,
+    chunk_size=2000,
+    executor=None,
+):
+    """Runs a Monte Carlo projection of a portfolio and returns the given percentiles of its
+    value for each month, as {percentile: array of months + 1 values}.
+
+    amounts and assumptions are parallel lists of the amount held in each category and its
+    (annual return, annual volatility). The paths are split into chunks of chunk_size, run in
+    executor (e.g. a ProcessPoolExecutor) when given and in this process otherwise; both give
+    the same result for the same seed.
+    """
+    drifts, volatilities = zip(
+        *(monthly_log_returns(*assumption) for assumption in assumptions)
+    )
+    chunks = [
+        (
+            [float(amount) for amount in amounts],
+            drifts,
+            volatilities,
+            months,
+            min(chunk_size, paths - start),
+            seed,
+            index,
+        )
+        for index, start in enumerate(range(0, paths, chunk_size))
+    ]
+    if executor is None:
+        results = [simulate_chunk(*chunk) for chunk in chunks]
+    else:
+        results = list(executor.map(simulate_chunk, *zip(*chunks)))
+
+    values = np.percentile(np.concatenate(results), percentiles, axis=0)
+    return dict(zip(percentiles, values))
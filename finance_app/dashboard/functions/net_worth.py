@@ -0,0 +1,60 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+
+from ..models import NetWorth
+from .financial_aggregates import CENTS, annotate_net_worth, calculate_net_worth
+from .snapshots import upsert_snapshots
+
+
+def record_net_worth_snapshot(user, snapshot_date=None):
+    """Stores the user's current net worth as the snapshot of the given day (today by default).
+    Call it whenever loans or portfolio snapshots of the user change.
+    """
+    snapshot_date = snapshot_date or date.today()
+    total_net_worth = calculate_net_worth(user)
+
+    upsert_snapshots(
+        NetWorth,
+        [NetWorth(user_name=user, total_net_worth=total_net_worth, date=snapshot_date)],
+        "total_net_worth",
+    )
+    return total_net_worth
+
+
+def snapshot_all_users(snapshot_date=None, batch_size=1000):
+    """Stores the net worth snapshot of every user for the given day using bulk queries.
+    Returns the number of snapshots written. No data version bump is needed: cached line charts
+    are keyed on the snapshots themselves (see cached_snapshot_line_chart).
+    """
+    snapshot_date = snapshot_date or date.today()
+    users = annotate_net_worth(get_user_model().objects.order_by("pk")).values_list(
+        "pk", "current_net_worth"
+    )
+    written = 0
+    batch = []
+
+    for row in users.iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) == batch_size:
+            written += _write_snapshots(batch, snapshot_date)
+            batch = []
+    if batch:
+        written += _write_snapshots(batch, snapshot_date)
+    return written
+
+
+def _write_snapshots(rows, snapshot_date):
+    upsert_snapshots(
+        NetWorth,
+        [
+            NetWorth(
+                user_name_id=user_id,
+                total_net_worth=total.quantize(CENTS),
+                date=snapshot_date,
+            )
+            for user_id, total in rows
+        ],
+        "total_net_worth",
+    )
+    return len(rows)
@@ -1,53 +1,56 @@
-import plotly.graph_objects as go
-import plotly.offline as opy
+from .chart_cache import get_or_build_chart
+from .chart_renderers import render_chart
+from .figure_spec import pie_figure
+from .request_timing import measure
+
+PIE_CHART_LAYOUT = dict(
+    width=600,
+    height=600,
+    font=dict(size=20, color="black", family="Arial, sans-serif"),
+)
 
 
 class PieChartBuilder:
     """A class to build pie charts from budget and allocation data."""
 
-    def __init__(self, amount, context):
+    def __init__(self, amount, context, renderer=None):
         self.amount = amount
         self.labels = []
         self.values = []
         self.percentage_sum = 100
         self.context = context
+        self.renderer = renderer
 
     def add_allocation(self, label, percentage):
         self.percentage_sum -= percentage
         self.labels.append(label.capitalize())
         self.values.append(percentage / 100 * self.amount)
 
-    def build_chart(self):
+    def slices(self):
+        """Returns the labels and values of the chart's slices."""
+        labels, values = list(self.labels), list(self.values)
         if self.percentage_sum > 0:
             # Add an "Other" category if the percentages do not sum to 100%
-            self.labels.append("Other")
-            self.values.append(self.percentage_sum / 100 * self.amount)
-
-        fig = go.Figure(
-            data=[
-                go.Pie(
-                    labels=self.labels,
-                    values=self.values,
-                    hoverinfo="label+percent+value",
-                    textinfo="label+percent",
-                )
-            ],
-            layout=go.Layout(
-                width=600,
-                height=600,
-                font=dict(size=20, color="black", family="Arial, sans-serif"),
-            ),
-        )
+            labels.append("Other")
+            values.append(self.percentage_sum / 100 * self.amount)
+        return labels, values
 
-        self.context["pie_chart"] = opy.plot(fig, auto_open=False, output_type="div")
+    @measure("chart")
+    def build_chart(self):
+        labels, values = self.slices()
+        fig = pie_figure(labels, values, layout=PIE_CHART_LAYOUT)
+
+        self.context["pie_chart"] = render_chart(fig, self.renderer)
         return self.context
 
 
-def create_pie_chart_from_form(budget_form, formset, context):
-    """Creates a pie chart based on the budget and allocation form data."""
+def pie_chart_from_form(budget_form, formset, context, renderer=None):
+    """Returns a PieChartBuilder holding the allocations of a valid budget form and formset."""
 
     chart = PieChartBuilder(
-        amount=int(budget_form.cleaned_data["money_amount"]), context=context
+        amount=int(budget_form.cleaned_data["money_amount"]),
+        context=context,
+        renderer=renderer,
     )
 
     for form in formset:
@@ -56,6 +59,13 @@ def create_pie_chart_from_form(budget_form, formset, context):
             chart.add_allocation(
                 label=form.cleaned_data.get("category"), percentage=percentage
             )
+    return chart
+
+
+def create_pie_chart_from_form(budget_form, formset, context, renderer=None):
+    """Creates a pie chart based on the budget and allocation form data."""
+
+    chart = pie_chart_from_form(budget_form, formset, context, renderer)
 
     if chart.percentage_sum < 0:
         context["message"] = "Total percentage cannot exceed 100%"
@@ -64,9 +74,9 @@ def create_pie_chart_from_form(budget_form, formset, context):
     return chart.build_chart()
 
 
-def create_pie_chart_from_budget(context, amount):
+def create_pie_chart_from_budget(context, amount, renderer=None):
     """Creates a pie chart from the budget allocations in the context."""
-    chart = PieChartBuilder(amount, context)
+    chart = PieChartBuilder(amount, context, renderer)
 
     for allocation in context["allocations"]:
         chart.add_allocation(
@@ -75,10 +85,22 @@ def create_pie_chart_from_budget(context, amount):
     return chart.build_chart()
 
 
-def create_a_pie_chart_from_investments(investment_form, context, amount):
+def cached_budget_pie_chart(user, budget, renderer=None):
+    """Returns the pie chart of a budget from the chart cache, building it on a miss.
+    The budget's allocations should be prefetched.
+    """
+
+    def build_pie_chart():
+        context = {"allocations": budget.allocations.all()}
+        return create_pie_chart_from_budget(context, budget.amount, renderer)["pie_chart"]
+
+    return get_or_build_chart(user, f"budget_pie.{renderer}", budget.pk, build_pie_chart)
+
+
+def create_a_pie_chart_from_investments(investment_form, context, amount, renderer=None):
     """Creates a pie chart from the investment form data."""
     
-    chart = PieChartBuilder(amount, context)
+    chart = PieChartBuilder(amount, context, renderer)
 
     for investment in investment_form:
         percentage = investment.cleaned_data.get("amount", 0) / amount * 100
@@ -0,0 +1,28 @@
+import hashlib
+import importlib.util
+import os
+from functools import lru_cache
+
+PLOTLY_JS_FILENAME = "plotly.min.js"
+PLOTLY_JS_STATIC_DIR = "dashboard/js"
+
+
+@lru_cache(maxsize=None)
+def plotly_js_source_path():
+    """Returns the path of the minified plotly.js bundle shipped with the plotly package."""
+    spec = importlib.util.find_spec("plotly")
+    package_dir = spec.submodule_search_locations[0]
+    return os.path.join(package_dir, "package_data", PLOTLY_JS_FILENAME)
+
+
+@lru_cache(maxsize=None)
+def plotly_js_static_name():
+    """Returns the content-hashed static name of plotly.js, e.g. 'dashboard/js/plotly.0123abcd4567.min.js'.
+    The hash changes whenever the plotly package is upgraded, so the file can be cached forever.
+    """
+    digest = hashlib.sha256()
+    with open(plotly_js_source_path(), "rb") as bundle:
+        for chunk in iter(lambda: bundle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return f"{PLOTLY_JS_STATIC_DIR}/plotly.{digest.hexdigest()[:12]}.min.js"
+
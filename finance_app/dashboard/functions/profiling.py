@@ -0,0 +1,109 @@
+import cProfile
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+
+PROFILE_HEADER = "HTTP_X_PROFILE"  # X-Profile: 1
+PROFILE_QUERY_PARAMETER = "profile"  # ?profile=1
+
+
+def profile_flag(request):
+    """True if the request asks for a profile, whoever sent it."""
+    return request.GET.get(PROFILE_QUERY_PARAMETER) == "1" or request.META.get(
+        PROFILE_HEADER
+    ) in ("1", "true")
+
+
+def profile_requested(request):
+    """True if a staff user asked for a profile of this request."""
+    user = getattr(request, "user", None)
+    return profile_flag(request) and user is not None and user.is_staff
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+class StackSampler(threading.Thread):
+    """Samples the stack of one thread every `interval` seconds and counts identical stacks."""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+    def collapsed(self):
+        """Returns the samples in the collapsed-stack format read by flamegraph.pl and speedscope."""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+
+class RequestProfiler:
+    """Profiles one request with cProfile and a stack sampler, and records its SQL statements.
+    Use it as a context manager, then save() the three files to PROFILE_DIR.
+    """
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.sampler = StackSampler(
+            threading.get_ident(), settings.PROFILE_SAMPLE_INTERVAL
+        )
+        self.queries = []
+
+    def database_wrapper(self, execute, sql, params, many, context):
+        """connection.execute_wrapper() hook recording every statement and its duration."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((time.perf_counter() - started, sql, params))
+
+    def __enter__(self):
+        self.sampler.start()
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profile.disable()
+        self.sampler.stop()
+
+    def save(self, url_name):
+        """Writes <name>.prof, <name>.collapsed.txt and <name>.sql.txt; returns <name>."""
+        directory = Path(settings.PROFILE_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        name = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{url_name}-{os.getpid()}"
+
+        self.profile.dump_stats(directory / f"{name}.prof")
+        (directory / f"{name}.collapsed.txt").write_text(self.sampler.collapsed())
+        total = sum(duration for duration, _, _ in self.queries)
+        lines = [f"-- {len(self.queries)} statements, {total * 1000:.2f} ms"]
+        for duration, sql, params in self.queries:
+            lines.append(f"-- {duration * 1000:.2f} ms, params: {params!r}\n{sql};")
+        (directory / f"{name}.sql.txt").write_text("\n\n".join(lines) + "\n")
+        return name
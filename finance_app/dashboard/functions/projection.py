@@ -0,0 +1,114 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+from django.conf import settings
+
+from ..list_and_dictionaries.statuses import (
+    INVESTMENT_ASSUMPTIONS,
+    PROJECTION_PERCENTILES,
+)
+from .chart_cache import get_or_build_chart, get_or_compute
+from .line_chart import LineChartBuilder
+
+_process_pool = None
+
+
+def process_pool():
+    """Returns the process pool shared by this process's large projections, started on first use.
+    Workers are spawned rather than forked, so they do not inherit the threads and database
+    connections of a web server process.
+    """
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(
+            max_workers=settings.PROJECTION_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _process_pool
+
+
+def projection_assumptions(category_name):
+    """Returns the (annual return, annual volatility) assumed for an investment category."""
+    assumptions = {**INVESTMENT_ASSUMPTIONS, **settings.PROJECTION_ASSUMPTIONS}
+    return assumptions.get(category_name, assumptions["Other"])
+
+
+def project_portfolio(investment_totals, start=None):
+    """Projects the value of a portfolio over the next PROJECTION_YEARS with PROJECTION_PATHS
+    Monte Carlo paths per category, given the rows of investment_totals_by_category().
+
+    Returns the month-by-month median and PROJECTION_PERCENTILES band in the data format of
+    LineChartBuilder: {'x': [dates], 'y': [median], 'lower': [...], 'upper': [...]}.
+    The percentiles are cached under a hash of the inputs, so repeated projections are a
+    cache lookup; large simulations are split across process_pool().
+    """
+    from .amortization import add_months  # numpy, like the simulation itself
+
+    start = start or date.today()
+    months = settings.PROJECTION_YEARS * 12
+    holdings = [
+        (float(row["total_amount"]), projection_assumptions(row["category_name"]))
+        for row in investment_totals
+        if row["total_amount"] > 0
+    ]
+    inputs = {
+        "holdings": holdings,
+        "months": months,
+        "paths": settings.PROJECTION_PATHS,
+        "seed": settings.PROJECTION_SEED,
+        "percentiles": PROJECTION_PERCENTILES,
+    }
+
+    def simulate():
+        from .monte_carlo import simulate_portfolio
+
+        amounts, assumptions = zip(*holdings)
+        work = settings.PROJECTION_PATHS * months * len(holdings)
+        bands = simulate_portfolio(
+            amounts,
+            assumptions,
+            months,
+            settings.PROJECTION_PATHS,
+            PROJECTION_PERCENTILES,
+            seed=settings.PROJECTION_SEED,
+            chunk_size=settings.PROJECTION_CHUNK_SIZE,
+            executor=(
+                process_pool() if work >= settings.PROJECTION_PARALLEL_WORK else None
+            ),
+        )
+        return [
+            bands[percentile].round(2).tolist() for percentile in PROJECTION_PERCENTILES
+        ]
+
+    if not holdings:
+        return {"x": [], "y": []}
+    lower, median, upper = get_or_compute("portfolio_projection", inputs, simulate)
+    return {
+        "x": [add_months(start, month) for month in range(months + 1)],
+        "y": median,
+        "lower": lower,
+        "upper": upper,
+    }
+
+
+def cached_projection_chart(user, investment_totals, renderer=None):
+    """Returns the projection line chart of the user's portfolio from the chart cache, building it on a miss."""
+
+    def build_projection_chart():
+        low, _, high = PROJECTION_PERCENTILES
+        return LineChartBuilder(
+            data=project_portfolio(investment_totals),
+            context={},
+            title=f"Projected Value ({low}th to {high}th percentile)",
+            x_axis_label="Date",
+            y_axis_label="Portfolio Value",
+            renderer=renderer,
+        ).build_chart()["line_chart"]
+
+    return get_or_build_chart(
+        user,
+        f"portfolio_projection.{renderer}",
+        settings.PROJECTION_YEARS,
+        build_projection_chart,
+    )
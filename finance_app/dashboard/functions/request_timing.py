@@ -0,0 +1,85 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Phases timed inside a request, in Server-Timing order
+PHASES = ["db", "tpl", "chart"]
+PHASE_DESCRIPTIONS = {
+    "total": "Total",
+    "db": "Database",
+    "tpl": "Template rendering",
+    "chart": "Chart building",
+}
+
+# Upper bounds (milliseconds / queries) of the buckets of the /metrics histograms
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+QUERY_COUNT_BUCKETS = [0, 1, 2, 5, 10, 20, 50, 100, 200]
+WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+_current_timings = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    """Accumulated time per phase (and number of database queries and writes) of the current request."""
+
+    def __init__(self):
+        self.durations = dict.fromkeys(PHASES, 0.0)
+        self.query_count = 0
+        self.write_count = 0
+        self._depth = dict.fromkeys(PHASES, 0)
+
+    def add(self, phase, seconds):
+        self.durations[phase] += seconds
+
+    def database_wrapper(self, execute, sql, params, many, context):
+        """connection.execute_wrapper() hook timing every query."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_count += 1
+            if sql.lstrip()[:7].upper().startswith(WRITE_STATEMENTS):
+                self.write_count += 1
+            self.add("db", time.perf_counter() - started)
+
+    def server_timing(self, total_seconds):
+        """Returns the Server-Timing header value, durations in milliseconds."""
+        metrics = [f'total;dur={total_seconds * 1000:.2f};desc="{PHASE_DESCRIPTIONS["total"]}"']
+        for phase in PHASES:
+            description = PHASE_DESCRIPTIONS[phase]
+            if phase == "db":
+                description = f"{description} ({self.query_count} queries)"
+            metrics.append(
+                f'{phase};dur={self.durations[phase] * 1000:.2f};desc="{description}"'
+            )
+        return ", ".join(metrics)
+
+
+def start_request():
+    """Starts collecting timings for the current request; returns (timings, token for finish_request)."""
+    timings = RequestTimings()
+    return timings, _current_timings.set(timings)
+
+
+def finish_request(token):
+    _current_timings.reset(token)
+
+
+@contextmanager
+def measure(phase):
+    """Adds the duration of the block to `phase` of the current request, if one is being timed.
+    Nested blocks of the same phase (e.g. included templates) are only counted once.
+    Also usable as a decorator: @measure("chart").
+    """
+    timings = _current_timings.get()
+    if timings is None or timings._depth[phase]:
+        yield
+        return
+
+    timings._depth[phase] += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings._depth[phase] -= 1
+        timings.add(phase, time.perf_counter() - started)
@@ -0,0 +1,149 @@
+from datetime import timedelta
+
+from django.db import transaction
+
+from ..models import (
+    InvestmentsRollup,
+    InvestmentsThroughTime,
+    NetWorth,
+    NetWorthRollup,
+)
+
+# Coarsest last
+ROLLUP_PERIODS = ["week", "month"]
+PERIOD_DAYS = {"week": 7, "month": 30}
+
+# Daily snapshot model -> (rollup model, value field)
+ROLLUPS = {
+    NetWorth: (NetWorthRollup, "total_net_worth"),
+    InvestmentsThroughTime: (InvestmentsRollup, "amount"),
+}
+
+ROLLUP_UNIQUE_FIELDS = ["user_name", "period", "period_start"]
+ROLLUP_VALUE_FIELDS = ["open", "close", "low", "high"]
+
+
+def period_start(day, period):
+    """Returns the first day of the week (Monday) or month containing day."""
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def period_end(start, period):
+    """Returns the first day after the period starting at start."""
+    if period == "week":
+        return start + timedelta(days=7)
+    return (start + timedelta(days=32)).replace(day=1)
+
+
+def choose_rollup_period(row_count, span_days, max_points):
+    """Returns None when the chart should read its row_count daily rows, i.e. when they fit in
+    max_points, otherwise the finest rollup period whose buckets over span_days fit
+    (the coarsest one when none does, the series is then downsampled).
+    """
+    if row_count <= max_points:
+        return None
+    for period in ROLLUP_PERIODS:
+        # +1 for the partial periods at both ends of the span
+        if span_days / PERIOD_DAYS[period] + 1 <= max_points:
+            return period
+    return ROLLUP_PERIODS[-1]
+
+
+def rollup_queryset(model, user, period):
+    """Returns the user's rollups of the daily snapshot model for the given period."""
+    rollup_model, _ = ROLLUPS[model]
+    return rollup_model.objects.filter(user_name=user, period=period)
+
+
+def _accumulate(buckets, user_id, day, value):
+    """Adds a daily value (rows must come in date order) to the open/close/low/high buckets."""
+    for period in ROLLUP_PERIODS:
+        key = (user_id, period, period_start(day, period))
+        bucket = buckets.get(key)
+        if bucket is None:
+            buckets[key] = [value, value, value, value]
+        else:
+            bucket[1] = value
+            bucket[2] = min(bucket[2], value)
+            bucket[3] = max(bucket[3], value)
+
+
+def _upsert_rollups(rollup_model, buckets):
+    rollup_model.objects.bulk_create(
+        [
+            rollup_model(
+                user_name_id=user_id,
+                period=period,
+                period_start=start,
+                **dict(zip(ROLLUP_VALUE_FIELDS, values)),
+            )
+            for (user_id, period, start), values in buckets.items()
+        ],
+        update_conflicts=True,
+        unique_fields=ROLLUP_UNIQUE_FIELDS,
+        update_fields=ROLLUP_VALUE_FIELDS,
+    )
+    return len(buckets)
+
+
+def refresh_rollups(model, user_days):
+    """Recomputes the week and month rollups containing each written (user_id, day) snapshot.
+    One query reads the daily rows of the affected periods and one upserts the rollups.
+    """
+    if not user_days:
+        return 0
+    rollup_model, value_field = ROLLUPS[model]
+
+    affected = set()
+    for user_id, day in user_days:
+        for period in ROLLUP_PERIODS:
+            affected.add((user_id, period, period_start(day, period)))
+    first_day = min(start for _, _, start in affected)
+    last_day = max(period_end(start, period) for _, period, start in affected)
+
+    rows = (
+        model.objects.filter(
+            user_name_id__in={user_id for user_id, _ in user_days},
+            date__gte=first_day,
+            date__lt=last_day,
+        )
+        .order_by("user_name", "date")
+        .values_list("user_name_id", "date", value_field)
+    )
+    buckets = {}
+    for user_id, day, value in rows:
+        _accumulate(buckets, user_id, day, value)
+
+    return _upsert_rollups(
+        rollup_model, {key: values for key, values in buckets.items() if key in affected}
+    )
+
+
+def rebuild_rollups(model, batch_size=5000):
+    """Rebuilds every rollup of the daily snapshot model from scratch, streaming the daily rows.
+    Returns the number of rollups written.
+    """
+    rollup_model, value_field = ROLLUPS[model]
+    rows = (
+        model.objects.order_by("user_name", "date")
+        .values_list("user_name_id", "date", value_field)
+        .iterator(chunk_size=batch_size)
+    )
+    written = 0
+    buckets = {}
+    current_user = None
+
+    with transaction.atomic():
+        rollup_model.objects.all().delete()
+        for user_id, day, value in rows:
+            # A user's buckets are complete once the next user starts.
+            if user_id != current_user and len(buckets) >= batch_size:
+                written += _upsert_rollups(rollup_model, buckets)
+                buckets = {}
+            current_user = user_id
+            _accumulate(buckets, user_id, day, value)
+        if buckets:
+            written += _upsert_rollups(rollup_model, buckets)
+    return written
@@ -0,0 +1,148 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from ..list_and_dictionaries.statuses import (
+    BUDGET_CATEGORY_CHOICES,
+    INVESTMENT_CATEGORIES,
+)
+from ..models import (
+    Budget,
+    Category,
+    Investment,
+    InvestmentsThroughTime,
+    Loans,
+    NetWorth,
+)
+from .rollups import ROLLUPS, rebuild_rollups
+
+SEED_PASSWORD = "benchmark-password"
+
+
+def _money(value):
+    return Decimal(value).quantize(Decimal("0.01"))
+
+
+def seed_users(
+    users=10,
+    budgets=5,
+    allocations=6,
+    loans=10,
+    investments=20,
+    days=3 * 365,
+    prefix="seed_user_",
+    seed=0,
+    batch_size=5000,
+):
+    """Creates `users` users with realistic financial data using bulk inserts only.
+    Each user gets budgets with allocations, loans, investments and `days` days of
+    portfolio and net worth snapshots ending today. Returns the created users.
+    """
+    rng = random.Random(seed)
+    today = date.today()
+    password = make_password(SEED_PASSWORD)
+    User = get_user_model()
+
+    usernames = [f"{prefix}{i}" for i in range(users)]
+
+    with transaction.atomic():
+        User.objects.bulk_create(
+            [
+                User(
+                    username=username,
+                    email=f"{username}@example.com",
+                    password=password,
+                )
+                for username in usernames
+            ]
+        )
+        # bulk_create does not return primary keys on every backend
+        created = list(User.objects.filter(username__in=usernames).order_by("pk"))
+
+        Budget.objects.bulk_create(
+            [
+                Budget(
+                    user_name=user,
+                    budget_name=f"{user.username} budget {j}",
+                    amount=_money(rng.uniform(500, 10000)),
+                )
+                for user in created
+                for j in range(budgets)
+            ],
+            batch_size=batch_size,
+        )
+        budget_rows = Budget.objects.filter(user_name__in=created)
+        Category.objects.bulk_create(
+            [
+                Category(
+                    budget=budget,
+                    category_name=category,
+                    percentage=_money(100 / (allocations + 1)),
+                )
+                for budget in budget_rows
+                for category, _ in rng.sample(BUDGET_CATEGORY_CHOICES, allocations)
+            ],
+            batch_size=batch_size,
+        )
+
+        Loans.objects.bulk_create(
+            [
+                Loans(
+                    user_name=user,
+                    loan_name=f"Loan {j}",
+                    amount=_money(rng.uniform(1000, 200000)),
+                    interest_rate=_money(rng.uniform(1, 12)),
+                    due_date=today + timedelta(days=rng.randint(180, 30 * 365)),
+                )
+                for user in created
+                for j in range(loans)
+            ],
+            batch_size=batch_size,
+        )
+        Investment.objects.bulk_create(
+            [
+                Investment(
+                    user_name=user,
+                    investment_name=f"Investment {j}",
+                    amount=_money(rng.uniform(100, 50000)),
+                    category_name=rng.choice(INVESTMENT_CATEGORIES)[0],
+                )
+                for user in created
+                for j in range(investments)
+            ],
+            batch_size=batch_size,
+        )
+
+        for user in created:
+            _seed_history(user, days, today, rng, batch_size)
+
+        for model in ROLLUPS:
+            rebuild_rollups(model, batch_size=batch_size)
+
+    return created
+
+
+def _seed_history(user, days, today, rng, batch_size):
+    """Daily portfolio values as a random walk and the matching net worth."""
+    loans_total = sum(loan.amount for loan in Loans.objects.filter(user_name=user))
+    value = rng.uniform(10000, 100000)
+    portfolio, net_worth = [], []
+
+    for offset in range(days, 0, -1):
+        day = today - timedelta(days=offset - 1)
+        value = max(0.0, value * (1 + rng.gauss(0.0003, 0.01)))
+        portfolio.append(
+            InvestmentsThroughTime(user_name=user, amount=_money(value), date=day)
+        )
+        net_worth.append(
+            NetWorth(
+                user_name=user, total_net_worth=_money(value) - loans_total, date=day
+            )
+        )
+
+    InvestmentsThroughTime.objects.bulk_create(portfolio, batch_size=batch_size)
+    NetWorth.objects.bulk_create(net_worth, batch_size=batch_size)
@@ -0,0 +1,34 @@
+from datetime import date
+
+from ..models import InvestmentsThroughTime
+from .rollups import refresh_rollups
+
+SNAPSHOT_UNIQUE_FIELDS = ["user_name", "date"]
+
+
+def upsert_snapshots(model, snapshots, value_field, batch_size=None):
+    """Inserts daily snapshots, overwriting the value of rows that already exist for the same user and day.
+    A single INSERT ... ON CONFLICT DO UPDATE per batch, relying on the (user_name, date) unique constraint.
+    The weekly and monthly rollups of the written days are refreshed afterwards.
+    """
+    snapshots = model.objects.bulk_create(
+        snapshots,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=SNAPSHOT_UNIQUE_FIELDS,
+        update_fields=[value_field],
+    )
+    refresh_rollups(
+        model, {(snapshot.user_name_id, snapshot.date) for snapshot in snapshots}
+    )
+    return snapshots
+
+
+def record_investments_snapshot(user, amount, snapshot_date=None):
+    """Stores the total value of the user's portfolio for the given day (today by default)."""
+    snapshot_date = snapshot_date or date.today()
+    upsert_snapshots(
+        InvestmentsThroughTime,
+        [InvestmentsThroughTime(user_name=user, amount=amount, date=snapshot_date)],
+        "amount",
+    )
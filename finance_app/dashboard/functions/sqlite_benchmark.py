@@ -0,0 +1,79 @@
+"""Concurrency benchmark of SQLite pragma profiles, used by the bench_sqlite command.
+Kept free of Django imports so worker processes start quickly.
+"""
+
+import random
+import sqlite3
+import time
+from datetime import date, timedelta
+
+FIRST_DAY = date(2020, 1, 1)
+
+
+def connect(path, pragmas):
+    # No busy wait of Python's own (its default is 5 seconds): only a profile's busy_timeout pragma
+    # makes a connection wait for a lock, so "default" measures SQLite's real defaults.
+    connection = sqlite3.connect(path, timeout=0, isolation_level=None)
+    for pragma, value in pragmas.items():
+        connection.execute(f"PRAGMA {pragma}={value}")
+    return connection
+
+
+def create_database(path, pragmas, users, days):
+    """Creates a snapshot table shaped like NetWorth, holding `days` daily rows per user."""
+    connection = connect(path, pragmas)
+    connection.execute(
+        "CREATE TABLE snapshot (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, "
+        "date TEXT NOT NULL, total DECIMAL NOT NULL, UNIQUE (user_id, date))"
+    )
+    connection.execute("BEGIN")
+    connection.executemany(
+        "INSERT INTO snapshot (user_id, date, total) VALUES (?, ?, ?)",
+        (
+            (user_id, (FIRST_DAY + timedelta(days=day)).isoformat(), day * 1.5)
+            for user_id in range(users)
+            for day in range(days)
+        ),
+    )
+    connection.execute("COMMIT")
+    connection.close()
+
+
+def run_worker(path, pragmas, role, users, days, duration):
+    """Runs reads (a user's whole series) or writes (a snapshot upsert) for `duration` seconds.
+    Returns (role, completed operations, "database is locked" errors, summed latency in seconds).
+    """
+    connection = connect(path, pragmas)
+    rng = random.Random()
+    operations = errors = 0
+    latency = 0.0
+    deadline = time.perf_counter() + duration
+
+    while time.perf_counter() < deadline:
+        user_id = rng.randrange(users)
+        started = time.perf_counter()
+        try:
+            if role == "read":
+                connection.execute(
+                    "SELECT date, total FROM snapshot WHERE user_id = ? ORDER BY date",
+                    (user_id,),
+                ).fetchall()
+            else:
+                day = (FIRST_DAY + timedelta(days=rng.randrange(days))).isoformat()
+                connection.execute("BEGIN IMMEDIATE")
+                connection.execute(
+                    "INSERT INTO snapshot (user_id, date, total) VALUES (?, ?, ?) "
+                    "ON CONFLICT (user_id, date) DO UPDATE SET total = excluded.total",
+                    (user_id, day, rng.random() * 1000),
+                )
+                connection.execute("COMMIT")
+        except sqlite3.OperationalError:
+            errors += 1
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            continue
+        operations += 1
+        latency += time.perf_counter() - started
+
+    connection.close()
+    return role, operations, errors, latency
@@ -0,0 +1,258 @@
+import hashlib
+import math
+from datetime import date
+from html import escape
+
+from .figure_spec import COLORWAY
+
+# Pie geometry and legend rows
+PIE_RADIUS_RATIO = 0.36
+PIE_MIN_LABEL_PERCENT = 4
+LEGEND_ROW_HEIGHT = 26
+
+# Plot area margins of line charts (top, right, bottom, left)
+LINE_MARGINS = (70, 30, 120, 90)
+LINE_Y_TICKS = 5
+LINE_X_TICKS = 6
+LINE_MAX_MARKERS = 60
+TICK_FONT_SIZE = 14
+
+
+def _number(value):
+    """Formats a coordinate with at most two decimals, the same way every time."""
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+
+def _money(value):
+    return f"{value:,.2f}"
+
+
+def _font(layout):
+    font = layout.get("font", {})
+    return (
+        font.get("family", "Arial, sans-serif"),
+        font.get("size", 16),
+        font.get("color", "black"),
+    )
+
+
+def _svg(width, height, layout, body):
+    family, size, color = _font(layout)
+    title = layout.get("title", {}).get("text")
+    label = f' aria-label="{escape(title)}"' if title else ""
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" class="chart-svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" role="img"{label} font-family="{escape(family)}" '
+        f'font-size="{size}" fill="{escape(color)}">'
+        f'<rect width="{width}" height="{height}" fill="white"/>{"".join(body)}</svg>'
+    )
+
+
+def _title(layout, width):
+    title = layout.get("title", {})
+    if not title.get("text"):
+        return ""
+    x = width * title.get("x", 0.5)
+    anchor = "middle" if title.get("x", 0.5) == 0.5 else "start"
+    return f'<text x="{_number(x)}" y="40" text-anchor="{anchor}">{escape(title["text"])}</text>'
+
+
+def _pie_svg(trace, layout):
+    width, height = layout.get("width", 600), layout.get("height", 600)
+    # Plotly sorts slices by value, largest first; sorted() keeps ties in input order
+    slices = sorted(
+        (
+            (label, float(value))
+            for label, value in zip(trace["labels"], trace["values"])
+            if value > 0
+        ),
+        key=lambda item: -item[1],
+    )
+    total = sum(value for _, value in slices)
+    if not total:
+        body = [
+            f'<text x="{_number(width / 2)}" y="{_number(height / 2)}" text-anchor="middle">No data yet</text>'
+        ]
+        return _svg(width, height, layout, body)
+
+    radius = min(width, height) * PIE_RADIUS_RATIO
+    cx, cy = width / 2, radius + 30
+    legend_top = cy + radius + 40
+    height = max(height, math.ceil(legend_top + len(slices) * LEGEND_ROW_HEIGHT))
+
+    body = [_title(layout, width)]
+    angle = 0.0  # radians, clockwise from 12 o'clock
+    for index, (label, value) in enumerate(slices):
+        color = COLORWAY[index % len(COLORWAY)]
+        share = value / total
+        tooltip = f"<title>{escape(label)}: {_money(value)} ({share:.1%})</title>"
+        if share >= 1:
+            body.append(
+                f'<circle cx="{_number(cx)}" cy="{_number(cy)}" r="{_number(radius)}" '
+                f'fill="{color}" stroke="white">{tooltip}</circle>'
+            )
+        else:
+            end = angle + share * 2 * math.pi
+            x1, y1 = cx + radius * math.sin(angle), cy - radius * math.cos(angle)
+            x2, y2 = cx + radius * math.sin(end), cy - radius * math.cos(end)
+            large_arc = 1 if share > 0.5 else 0
+            body.append(
+                f'<path d="M{_number(cx)} {_number(cy)}L{_number(x1)} {_number(y1)}'
+                f'A{_number(radius)} {_number(radius)} 0 {large_arc} 1 {_number(x2)} {_number(y2)}Z" '
+                f'fill="{color}" stroke="white">{tooltip}</path>'
+            )
+
+        if share * 100 >= PIE_MIN_LABEL_PERCENT:
+            middle = angle + share * math.pi
+            x = cx + radius * 0.65 * math.sin(middle)
+            y = cy - radius * 0.65 * math.cos(middle)
+            body.append(
+                f'<text x="{_number(x)}" y="{_number(y)}" text-anchor="middle" dominant-baseline="middle" '
+                f'fill="white" font-size="{TICK_FONT_SIZE}">{share:.1%}</text>'
+            )
+        angle += share * 2 * math.pi
+
+        y = legend_top + index * LEGEND_ROW_HEIGHT
+        body.append(
+            f'<rect x="{_number(width * 0.2)}" y="{_number(y - 14)}" width="16" height="16" fill="{color}"/>'
+            f'<text x="{_number(width * 0.2 + 24)}" y="{_number(y)}" font-size="{TICK_FONT_SIZE + 2}">'
+            f"{escape(label)}: {_money(value)} ({share:.1%})</text>"
+        )
+
+    return _svg(width, height, layout, body)
+
+
+def _to_number(value):
+    """Maps dates (or ISO date strings) to day numbers and everything else to floats."""
+    if isinstance(value, str):
+        value = date.fromisoformat(value)
+    if isinstance(value, date):
+        return value.toordinal()
+    return float(value)
+
+
+def _nice_step(span, ticks):
+    """Returns a 1, 2 or 5 times a power of ten step giving about `ticks` intervals over span."""
+    raw = span / ticks if span > 0 else 1
+    magnitude = 10 ** math.floor(math.log10(raw))
+    for multiple in (1, 2, 5, 10):
+        if raw <= multiple * magnitude:
+            return multiple * magnitude
+    return 10 * magnitude
+
+
+def _line_svg(trace, layout, lower=None, upper=None):
+    width, height = layout.get("width", 600), layout.get("height", 600)
+    top, right, bottom, left = LINE_MARGINS
+    plot_width, plot_height = width - left - right, height - top - bottom
+    x_axis, y_axis = layout.get("xaxis", {}), layout.get("yaxis", {})
+    line_color = trace.get("line", {}).get("color", COLORWAY[0])
+
+    body = [_title(layout, width)]
+    points = [(_to_number(x), float(y)) for x, y in zip(trace["x"], trace["y"])]
+    if not points:
+        body.append(
+            f'<text x="{_number(width / 2)}" y="{_number(height / 2)}" text-anchor="middle">No data yet</text>'
+        )
+        return _svg(width, height, layout, body)
+
+    x_values = [x for x, _ in points]
+    y_values = [y for _, y in points]
+    if upper is not None:
+        # Band traces share the x values of the line
+        lower_values = [float(y) for y in lower["y"]]
+        upper_values = [float(y) for y in upper["y"]]
+        y_values = y_values + lower_values + upper_values
+    x_min, x_max = min(x_values), max(x_values)
+    step = _nice_step(max(y_values) - min(y_values), LINE_Y_TICKS)
+    y_min = math.floor(min(y_values) / step) * step
+    y_max = math.ceil(max(y_values) / step) * step
+    if y_max == y_min:
+        y_min, y_max = y_min - step, y_max + step
+
+    def sx(x):
+        return left + (
+            (x - x_min) / (x_max - x_min) * plot_width
+            if x_max > x_min
+            else plot_width / 2
+        )
+
+    def sy(y):
+        return top + plot_height - (y - y_min) / (y_max - y_min) * plot_height
+
+    grid = escape(y_axis.get("gridcolor", "#EBF0F8"))
+    for index in range(round((y_max - y_min) / step) + 1):
+        tick = y_min + index * step
+        y = _number(sy(tick))
+        body.append(
+            f'<line x1="{left}" y1="{y}" x2="{left + plot_width}" y2="{y}" stroke="{grid}"/>'
+            f'<text x="{left - 8}" y="{y}" text-anchor="end" dominant-baseline="middle" '
+            f'font-size="{TICK_FONT_SIZE}">{tick:,.{0 if step >= 1 else 2}f}</text>'
+        )
+
+    is_date = isinstance(trace["x"][0], (date, str))
+    x_ticks = min(LINE_X_TICKS, len(set(x_values)))
+    grid = escape(x_axis.get("gridcolor", "#EBF0F8"))
+    for index in range(x_ticks):
+        x = x_min + (x_max - x_min) * index / max(x_ticks - 1, 1)
+        label = date.fromordinal(round(x)).isoformat() if is_date else _number(x)
+        px = _number(sx(x))
+        body.append(
+            f'<line x1="{px}" y1="{top}" x2="{px}" y2="{top + plot_height}" stroke="{grid}"/>'
+            f'<text x="{px}" y="{top + plot_height + 16}" text-anchor="end" font-size="{TICK_FONT_SIZE}" '
+            f'transform="rotate(-45 {px} {top + plot_height + 16})">{escape(label)}</text>'
+        )
+
+    if upper is not None:
+        outline = list(zip(x_values, upper_values)) + list(
+            zip(reversed(x_values), reversed(lower_values))
+        )
+        polygon = " ".join(f"{_number(sx(x))},{_number(sy(y))}" for x, y in outline)
+        body.append(
+            f'<polygon points="{polygon}" fill="{escape(upper["fillcolor"])}" stroke="none"/>'
+        )
+
+    path = "".join(
+        f"{'M' if index == 0 else 'L'}{_number(sx(x))} {_number(sy(y))}"
+        for index, (x, y) in enumerate(points)
+    )
+    body.append(
+        f'<path d="{path}" fill="none" stroke="{line_color}" stroke-width="2"/>'
+    )
+    if len(points) <= LINE_MAX_MARKERS:
+        for (x, y), raw_x in zip(points, trace["x"]):
+            label = raw_x.isoformat() if isinstance(raw_x, date) else raw_x
+            body.append(
+                f'<circle cx="{_number(sx(x))}" cy="{_number(sy(y))}" r="4" fill="{line_color}">'
+                f"<title>{escape(str(label))}: {_money(y)}</title></circle>"
+            )
+
+    x_title = x_axis.get("title", {}).get("text")
+    if x_title:
+        body.append(
+            f'<text x="{_number(left + plot_width / 2)}" y="{height - 10}" text-anchor="middle">{escape(x_title)}</text>'
+        )
+    y_title = y_axis.get("title", {}).get("text")
+    if y_title:
+        y = _number(top + plot_height / 2)
+        body.append(
+            f'<text x="20" y="{y}" text-anchor="middle" transform="rotate(-90 20 {y})">{escape(y_title)}</text>'
+        )
+    return _svg(width, height, layout, body)
+
+
+SVG_RENDERERS = {"pie": _pie_svg, "scatter": _line_svg}
+
+
+def render_svg(figure):
+    """Renders a figure_spec pie or line figure as inline SVG: no JavaScript, and the same
+    figure always gives byte-identical output, so it can be content-hashed and cached.
+    """
+    # A line may come after the lower and upper traces of a band
+    *bands, trace = figure["data"]
+    return SVG_RENDERERS[trace["type"]](trace, figure["layout"], *bands)
+
+
+def svg_digest(svg):
+    """Returns the content hash naming a rendered SVG."""
+    return hashlib.sha256(svg.encode()).hexdigest()[:16]
@@ -22,6 +22,35 @@ INVESTMENT_CATEGORIES = [
     ("Other", "Other"),
 ]
 
+# Long-run annual expected return and volatility of each investment category, used by the
+# portfolio projection (see functions/projection.py). settings.PROJECTION_ASSUMPTIONS overrides them.
+INVESTMENT_ASSUMPTIONS = {
+    "Stocks": (0.07, 0.18),
+    "Gold": (0.04, 0.15),
+    "Bonds": (0.035, 0.06),
+    "Real Estate": (0.05, 0.12),
+    "Mutual Funds": (0.06, 0.15),
+    "Cryptocurrency": (0.10, 0.70),
+    "Commodities": (0.03, 0.20),
+    "Exchange-Traded Funds (ETFs)": (0.065, 0.16),
+    "Index Funds": (0.065, 0.15),
+    "Options": (0.05, 0.60),
+    "Forex": (0.0, 0.10),
+    "Peer-to-Peer Lending": (0.05, 0.08),
+    "Crowdfunding": (0.04, 0.30),
+    "Retirement Accounts": (0.06, 0.12),
+    "Savings Accounts": (0.02, 0.005),
+    "Certificates of Deposit (CDs)": (0.03, 0.005),
+    "Treasury Securities": (0.03, 0.04),
+    "Annuities": (0.03, 0.02),
+    "Precious Metals": (0.04, 0.16),
+    "Collectibles": (0.03, 0.25),
+    "Other": (0.03, 0.10),
+}
+
+# Percentiles of the projected portfolio value: the band's lower bound, the line and the upper bound
+PROJECTION_PERCENTILES = (10, 50, 90)
+
 BUDGET_CATEGORY_CHOICES = [
     ("education", "Education"),
     ("savings", "Savings"),
@@ -46,3 +75,39 @@ BUDGET_CATEGORY_CHOICES = [
     ("pets", "Pets"),
     ("travel", "Travel"),
 ]
+
+# Time windows offered by the line charts, in days (None means the whole history)
+CHART_DATE_RANGES = {
+    "30d": 30,
+    "1y": 365,
+    "all": None,
+}
+
+# Where extra loan payments go first (see functions/amortization.py)
+LOAN_STRATEGY_CHOICES = [
+    ("avalanche", "Avalanche (highest interest rate first)"),
+    ("snowball", "Snowball (smallest balance first)"),
+]
+
+# What the CSV import takes (see functions/csv_import.py)
+IMPORT_KIND_CHOICES = [
+    ("loans", "Loans"),
+    ("investments", "Investments"),
+]
+
+# Background jobs (see functions/jobs.py)
+RECOMPUTE_SNAPSHOT = "recompute_snapshot"
+PRERENDER_CHARTS = "prerender_charts"
+JOB_KIND_CHOICES = [
+    (RECOMPUTE_SNAPSHOT, "Recompute snapshot"),
+    (PRERENDER_CHARTS, "Pre-render charts"),
+]
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_FAILED = "failed"
+JOB_STATUS_CHOICES = [
+    (JOB_PENDING, "Pending"),
+    (JOB_RUNNING, "Running"),
+    (JOB_FAILED, "Failed"),
+]
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Stores the persistent pragmas of settings.SQLITE_PROFILE (the journal mode) in the "
+        "database file. Run it once per database, and again after changing the profile."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        profile = settings.SQLITE_PROFILES[settings.SQLITE_PROFILE]
+        with connections[options["database"]].cursor() as cursor:
+            for pragma, default in settings.SQLITE_PERSISTENT_PRAGMAS.items():
+                cursor.execute(f"PRAGMA {pragma}={profile.get(pragma, default)}")
+                (value,) = cursor.fetchone()
+                self.stdout.write(self.style.SUCCESS(f"{pragma}={value}"))
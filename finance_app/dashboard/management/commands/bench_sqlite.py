@@ -0,0 +1,72 @@
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from dashboard.functions.sqlite_benchmark import create_database, run_worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures SQLite throughput of each profile in settings.SQLITE_PROFILES "
+        "under parallel reader and writer processes and prints a JSON report."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--readers", type=int, default=4)
+        parser.add_argument("--writers", type=int, default=2)
+        parser.add_argument(
+            "--duration", type=float, default=5.0, help="Seconds per profile."
+        )
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--days", type=int, default=365)
+        parser.add_argument(
+            "--profile",
+            action="append",
+            dest="profiles",
+            help="Profile to measure, may be repeated (default: all profiles).",
+        )
+
+    def handle(self, *args, **options):
+        profiles = options["profiles"] or list(settings.SQLITE_PROFILES)
+        report = {}
+
+        for profile in profiles:
+            pragmas = settings.SQLITE_PROFILES[profile]
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "bench.sqlite3")
+                create_database(path, pragmas, options["users"], options["days"])
+                report[profile] = self.run_profile(path, pragmas, options)
+
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def run_profile(self, path, pragmas, options):
+        roles = ["read"] * options["readers"] + ["write"] * options["writers"]
+        with ProcessPoolExecutor(max_workers=len(roles)) as pool:
+            futures = [
+                pool.submit(
+                    run_worker,
+                    path,
+                    pragmas,
+                    role,
+                    options["users"],
+                    options["days"],
+                    options["duration"],
+                )
+                for role in roles
+            ]
+            results = [future.result() for future in futures]
+
+        summary = {}
+        for role in ("read", "write"):
+            operations = sum(r[1] for r in results if r[0] == role)
+            latency = sum(r[3] for r in results if r[0] == role)
+            summary[f"{role}s_per_second"] = round(operations / options["duration"], 1)
+            summary[f"{role}_mean_latency_ms"] = (
+                round(latency / operations * 1000, 3) if operations else None
+            )
+            summary[f"{role}_lock_errors"] = sum(r[2] for r in results if r[0] == role)
+        return summary
@@ -0,0 +1,120 @@
+import json
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Modules a worker should not need to import before its first request
+HEAVY_MODULES = [
+    "numpy",
+    "pandas",
+    "narwhals",
+    "plotly.graph_objects",
+    "plotly.express",
+]
+
+# Run in a fresh interpreter: loads the WSGI application and every view module, like a worker before
+# its first request, optionally builds one chart, then reports its timings, peak RSS and heavy modules.
+STARTUP_SCRIPT = """
+import json, os, resource, sys, time
+started = time.perf_counter()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "finance_app.settings")
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+ready = time.perf_counter()
+if {build_chart}:
+    from dashboard.functions.pieChart import PieChartBuilder
+    chart = PieChartBuilder(1000, {{}})
+    chart.add_allocation("food", 40)
+    chart.build_chart()
+print(json.dumps({{
+    "startup_ms": (ready - started) * 1000,
+    "first_chart_ms": (time.perf_counter() - ready) * 1000,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "heavy_modules": [name for name in {heavy_modules!r} if name in sys.modules],
+}}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures the cold start of a worker (WSGI application and views loaded) in fresh "
+        "interpreters: startup time, peak RSS, heavy modules imported and the slowest imports "
+        "reported by python -X importtime. Prints a JSON report."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Fresh interpreters to time."
+        )
+        parser.add_argument(
+            "--top", type=int, default=15, help="Slowest imports to report."
+        )
+        parser.add_argument(
+            "--build-chart",
+            action="store_true",
+            help="Also build a pie chart, to measure the cost of the first chart.",
+        )
+        parser.add_argument("--output", help="Also write the report to this file.")
+
+    def run_script(self, build_chart, *python_options):
+        script = STARTUP_SCRIPT.format(
+            build_chart=build_chart, heavy_modules=HEAVY_MODULES
+        )
+        return subprocess.run(
+            [sys.executable, *python_options, "-c", script],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+    def handle(self, *args, **options):
+        runs = [
+            json.loads(self.run_script(options["build_chart"]).stdout)
+            for _ in range(options["repeat"])
+        ]
+        importtime = self.run_script(options["build_chart"], "-X", "importtime").stderr
+
+        report = {
+            "runs": options["repeat"],
+            "build_chart": options["build_chart"],
+            "heavy_modules": runs[0]["heavy_modules"],
+            "slowest_imports": self.slowest_imports(importtime, options["top"]),
+        }
+        for metric in ("startup_ms", "first_chart_ms", "max_rss_mb"):
+            values = [run[metric] for run in runs]
+            report[metric] = {
+                "median": round(statistics.median(values), 1),
+                "min": round(min(values), 1),
+                "max": round(max(values), 1),
+            }
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as report_file:
+                report_file.write(output + "\n")
+        self.stdout.write(output)
+
+    def slowest_imports(self, importtime, top):
+        """Parses `import time: self [us] | cumulative | name` lines into the `top` slowest cumulative imports."""
+        imports = []
+        for line in importtime.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, self_us, cumulative_us, name = [
+                part.strip() for part in line.replace("import time:", "|").split("|")
+            ]
+            imports.append(
+                {
+                    "module": name,
+                    "self_ms": round(int(self_us) / 1000, 1),
+                    "cumulative_ms": round(int(cumulative_us) / 1000, 1),
+                }
+            )
+        imports.sort(key=lambda item: item["cumulative_ms"], reverse=True)
+        return imports[:top]
@@ -0,0 +1,55 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from dashboard.functions.data_export import EXPORT_FORMATS, export_user_to_file
+
+
+class Command(BaseCommand):
+    help = (
+        "Exports every user's data (or the given users') to one gzip-compressed "
+        "CSV or NDJSON file per user, in a pool of worker processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "usernames", nargs="*", help="Users to export (default: all)."
+        )
+        parser.add_argument(
+            "--output-dir", default="exports", help="Directory of the export files."
+        )
+        parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="csv")
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Worker processes (default: one per CPU).",
+        )
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.order_by("pk")
+        if options["usernames"]:
+            users = users.filter(username__in=options["usernames"])
+        user_ids = list(users.values_list("pk", flat=True))
+        os.makedirs(options["output_dir"], exist_ok=True)
+
+        export = partial(
+            export_user_to_file,
+            export_format=options["format"],
+            directory=options["output_dir"],
+        )
+        # Spawned workers set Django up on their own instead of inheriting this process's database connection
+        with ProcessPoolExecutor(
+            max_workers=options["processes"],
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=django.setup,
+        ) as pool:
+            for path in pool.map(export, user_ids):
+                self.stdout.write(path)
+
+        self.stdout.write(self.style.SUCCESS(f"Exported {len(user_ids)} users."))
@@ -0,0 +1,46 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.functions.csv_import import CSV_IMPORT_FORMS, import_csv
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports a user's loans or investments from a CSV file of any size, "
+        "reporting every invalid row."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("username")
+        parser.add_argument("kind", choices=list(CSV_IMPORT_FORMS))
+        parser.add_argument("path", help="CSV file whose first row names the columns.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Rows per bulk insert (default: settings.IMPORT_BATCH_SIZE).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options["username"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user named {options['username']!r}.")
+
+        def report_error(row_number, errors):
+            for column, messages in errors.items():
+                self.stderr.write(f"Row {row_number}: {column}: {' '.join(messages)}")
+
+        with open(options["path"], newline="", encoding="utf-8-sig") as lines:
+            imported, skipped = import_csv(
+                user,
+                options["kind"],
+                lines,
+                report_error,
+                batch_size=options["batch_size"],
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {imported} {options['kind']}, skipped {skipped} invalid rows."
+            )
+        )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.functions.rollups import ROLLUPS, rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the weekly and monthly rollups of the net worth and portfolio snapshots."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        for model in ROLLUPS:
+            written = rebuild_rollups(model, batch_size=options["batch_size"])
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Stored {written} rollups of {model._meta.verbose_name_plural}."
+                )
+            )
@@ -0,0 +1,74 @@
+import json
+import platform
+from datetime import datetime, timezone
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+
+from dashboard.functions.benchmarking import (
+    benchmark_scenarios,
+    run_scenario,
+    uncovered_routes,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Times every dashboard route through the test client as a seeded user (see seed_data) "
+        "and prints p50/p95/p99 latency, response bytes and query counts as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--username", default="seed_user_0", help="Seeded user to log in as."
+        )
+        parser.add_argument(
+            "--iterations", type=int, default=50, help="Requests per scenario."
+        )
+        parser.add_argument(
+            "--warmup", type=int, default=3, help="Untimed requests per scenario."
+        )
+        parser.add_argument(
+            "--output", help="Write the JSON report to this file instead of stdout."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options["username"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(
+                f"User {options['username']!r} does not exist, run `manage.py seed_data` first."
+            )
+
+        scenarios = benchmark_scenarios(user)
+        for route in uncovered_routes(scenarios):
+            self.stderr.write(f"No benchmark scenario covers the {route!r} route.")
+
+        results = {}
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            client = Client()
+            for name, _, method, path, data in scenarios:
+                # Logging in again keeps scenarios independent of each other
+                client.force_login(user)
+                if options["warmup"]:
+                    run_scenario(client, method, path, data, options["warmup"])
+                results[name] = run_scenario(
+                    client, method, path, data, options["iterations"]
+                )
+
+        report = {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "username": user.username,
+            "scenarios": results,
+        }
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as report_file:
+                report_file.write(output + "\n")
+        else:
+            self.stdout.write(output)
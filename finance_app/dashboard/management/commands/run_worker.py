@@ -0,0 +1,60 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+
+from dashboard.functions.jobs import claim_jobs, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the queued background jobs (net worth snapshots, chart pre-rendering) "
+        "in a pool of worker processes, polling the job table for new ones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Worker processes (default: one per CPU).",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when the queue is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the queue is empty instead of polling.",
+        )
+
+    def handle(self, *args, **options):
+        processes = options["processes"]
+        # Spawned workers set Django up on their own instead of inheriting this process's database connection
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=django.setup,
+        ) as pool:
+            while True:
+                job_ids = claim_jobs(processes)
+                if job_ids:
+                    failed = list(pool.map(run_job, job_ids)).count(False)
+                    self.stdout.write(f"Ran {len(job_ids)} jobs, {failed} failed.")
+                    continue
+
+                requeued = requeue_stale_jobs()
+                if requeued:
+                    self.stdout.write(f"Requeued {requeued} timed out jobs.")
+                elif options["once"]:
+                    break
+                else:
+                    time.sleep(options["poll_interval"])
+
+        self.stdout.write(self.style.SUCCESS("Job queue is empty."))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.functions.seeding import SEED_PASSWORD, seed_users
+
+
+class Command(BaseCommand):
+    help = "Seeds users with budgets, loans, investments and years of daily snapshots for benchmarking."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument("--budgets", type=int, default=5, help="Budgets per user.")
+        parser.add_argument(
+            "--allocations", type=int, default=6, help="Allocations per budget."
+        )
+        parser.add_argument("--loans", type=int, default=10, help="Loans per user.")
+        parser.add_argument(
+            "--investments", type=int, default=20, help="Investments per user."
+        )
+        parser.add_argument(
+            "--days", type=int, default=3 * 365, help="Days of snapshot history."
+        )
+        parser.add_argument("--prefix", default="seed_user_", help="Username prefix.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+
+    def handle(self, *args, **options):
+        users = seed_users(
+            users=options["users"],
+            budgets=options["budgets"],
+            allocations=options["allocations"],
+            loans=options["loans"],
+            investments=options["investments"],
+            days=options["days"],
+            prefix=options["prefix"],
+            seed=options["seed"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {len(users)} users named {options['prefix']}<n>, "
+                f"password '{SEED_PASSWORD}'."
+            )
+        )
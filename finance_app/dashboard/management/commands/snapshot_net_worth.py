@@ -0,0 +1,22 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from dashboard.functions.net_worth import snapshot_all_users
+
+
+class Command(BaseCommand):
+    help = "Stores today's net worth snapshot of every user. Meant to be scheduled daily (e.g. cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date",
+            type=date.fromisoformat,
+            default=None,
+            help="Snapshot day in YYYY-MM-DD format (default: today).",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        written = snapshot_all_users(options["date"], batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Stored {written} net worth snapshots."))
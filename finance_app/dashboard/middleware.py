@@ -1,7 +1,15 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.shortcuts import redirect
 from django.conf import settings
+from django.db import connection
 from django.urls import resolve
 
+from .functions import metrics
+from .functions.profiling import RequestProfiler, profile_flag, profile_requested
+from .functions.request_timing import finish_request, start_request
+
 
 EXEMPT_URLS = [
    'dashboard'
@@ -15,4 +23,119 @@ EXEMPT_URLS = [
 #         current_url_name = resolve(request.path_info).url_name
 #         if not request.user.is_authenticated and current_url_name not in EXEMPT_URLS:
 #             return redirect(f'{settings.LOGIN_URL}?next={request.path}')
-#         return self.get_response(request)
\ No newline at end of file
+#         return self.get_response(request)
+
+
+def _url_name(request):
+    match = request.resolver_match
+    return (match.url_name if match else None) or "unresolved"
+
+
+async def _add_execute_wrapper(wrapper):
+    """Installs an execute wrapper on the connection of the thread running the request's ORM queries.
+    Under ASGI the async ORM runs every query of a request in one thread, not the event loop's.
+    """
+    await sync_to_async(lambda: connection.execute_wrappers.append(wrapper))()
+
+
+async def _remove_execute_wrapper(wrapper):
+    await sync_to_async(lambda: connection.execute_wrappers.remove(wrapper))()
+
+
+class PerformanceMiddleware:
+    """Times every request: total, database (time and query count), template rendering and chart building.
+    The timings are sent back in a Server-Timing header and kept per URL name in the node-wide
+    histograms served on /metrics (see functions/metrics.py).
+    Keep it first in MIDDLEWARE so the total covers the other middleware too.
+    Works under WSGI and ASGI, so async views are not pushed into a thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        timings, token = start_request()
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(timings.database_wrapper):
+                response = self.get_response(request)
+        finally:
+            finish_request(token)
+        return self.finish(request, response, timings, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        timings, token = start_request()
+        started = time.perf_counter()
+        await _add_execute_wrapper(timings.database_wrapper)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await _remove_execute_wrapper(timings.database_wrapper)
+            finish_request(token)
+        total = time.perf_counter() - started
+        # The metrics may be flushed to their SQLite file, keep that off the event loop
+        return await sync_to_async(self.finish, thread_sensitive=False)(
+            request, response, timings, total
+        )
+
+    def finish(self, request, response, timings, total):
+        url_name = _url_name(request)
+        metrics.record_request(url_name, total, timings)
+        response["Server-Timing"] = timings.server_timing(total)
+        return response
+
+
+class ProfilerMiddleware:
+    """Profiles a request when a staff user adds ?profile=1 (or an X-Profile: 1 header) to any URL.
+    The cProfile stats, collapsed stack samples and SQL statements are written to PROFILE_DIR
+    (see functions/profiling.py); the response names them in an X-Profile-Id header.
+    Must come after AuthenticationMiddleware.
+    Under ASGI the profile covers the event loop thread, so other requests served meanwhile show up too.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not profile_requested(request):
+            return self.get_response(request)
+
+        with RequestProfiler() as profiler:
+            with connection.execute_wrapper(profiler.database_wrapper):
+                response = self.get_response(request)
+
+        response["X-Profile-Id"] = profiler.save(_url_name(request))
+        return response
+
+    async def __acall__(self, request):
+        if not (profile_flag(request) and (await request.auser()).is_staff):
+            return await self.get_response(request)
+
+        with RequestProfiler() as profiler:
+            await _add_execute_wrapper(profiler.database_wrapper)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await _remove_execute_wrapper(profiler.database_wrapper)
+
+        response["X-Profile-Id"] = await sync_to_async(profiler.save)(
+            _url_name(request)
+        )
+        return response
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.3 on 2026-10-18 20:10
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def remove_duplicate_snapshots(apps, schema_editor):
+    """Keeps only the most recent row of each (user, day) so the unique constraints can be created."""
+    for model_name in ("InvestmentsThroughTime", "NetWorth"):
+        model = apps.get_model("dashboard", model_name)
+        latest_ids = (
+            model.objects.values("user_name", "date")
+            .annotate(latest_id=Max("id"))
+            .values_list("latest_id", flat=True)
+        )
+        model.objects.exclude(id__in=list(latest_ids)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0010_alter_networth_date'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='investmentsthroughtime',
+            options={'ordering': ['date']},
+        ),
+        migrations.AlterModelOptions(
+            name='networth',
+            options={'ordering': ['date']},
+        ),
+        migrations.RunPython(remove_duplicate_snapshots, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='investmentsthroughtime',
+            constraint=models.UniqueConstraint(fields=('user_name', 'date'), name='unique_investments_snapshot_per_day'),
+        ),
+        migrations.AddConstraint(
+            model_name='networth',
+            constraint=models.UniqueConstraint(fields=('user_name', 'date'), name='unique_net_worth_snapshot_per_day'),
+        ),
+    ]
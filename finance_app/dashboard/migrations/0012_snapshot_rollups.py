@@ -0,0 +1,52 @@
+# Generated by Django 5.2.3 on 2026-10-18 20:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0011_snapshot_per_day_constraints'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvestmentsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('week', 'Week'), ('month', 'Month')], max_length=5)),
+                ('period_start', models.DateField()),
+                ('open', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('close', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('low', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('high', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('user_name', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='investments_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['period_start'],
+                'abstract': False,
+                'constraints': [models.UniqueConstraint(fields=('user_name', 'period', 'period_start'), name='unique_investments_rollup_per_period')],
+            },
+        ),
+        migrations.CreateModel(
+            name='NetWorthRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('week', 'Week'), ('month', 'Month')], max_length=5)),
+                ('period_start', models.DateField()),
+                ('open', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('close', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('low', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('high', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('user_name', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='net_worth_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['period_start'],
+                'abstract': False,
+                'constraints': [models.UniqueConstraint(fields=('user_name', 'period', 'period_start'), name='unique_net_worth_rollup_per_period')],
+            },
+        ),
+    ]
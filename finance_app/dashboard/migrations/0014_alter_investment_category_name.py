@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 22:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0013_job'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='investment',
+            name='category_name',
+            field=models.CharField(choices=[('Stocks', 'Stocks'), ('Gold', 'Gold'), ('Bonds', 'Bonds'), ('Real Estate', 'Real Estate'), ('Mutual Funds', 'Mutual Funds'), ('Cryptocurrency', 'Cryptocurrency'), ('Commodities', 'Commodities'), ('Exchange-Traded Funds (ETFs)', 'Exchange-Traded Funds (ETFs)'), ('Index Funds', 'Index Funds'), ('Options', 'Options'), ('Forex', 'Forex'), ('Peer-to-Peer Lending', 'Peer-to-Peer Lending'), ('Crowdfunding', 'Crowdfunding'), ('Retirement Accounts', 'Retirement Accounts'), ('Savings Accounts', 'Savings Accounts'), ('Certificates of Deposit (CDs)', 'Certificates of Deposit (CDs)'), ('Treasury Securities', 'Treasury Securities'), ('Annuities', 'Annuities'), ('Precious Metals', 'Precious Metals'), ('Collectibles', 'Collectibles'), ('Other', 'Other')], default='Bonds', max_length=100),
+        ),
+    ]
@@ -1,7 +1,12 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
-from .list_and_dictionaries.statuses import INVESTMENT_CATEGORIES
+from .list_and_dictionaries.statuses import (
+    INVESTMENT_CATEGORIES,
+    JOB_KIND_CHOICES,
+    JOB_PENDING,
+    JOB_STATUS_CHOICES,
+)
 
 # Create your models here.
 
@@ -75,6 +80,15 @@ class InvestmentsThroughTime(models.Model):
     )
     date = models.DateField()
 
+    class Meta:
+        ordering = ["date"]
+        constraints = [
+            # One snapshot per user and day; its index also serves the per-user date range scans.
+            models.UniqueConstraint(
+                fields=["user_name", "date"], name="unique_investments_snapshot_per_day"
+            ),
+        ]
+
     def __str__(self):
         return f"{self.amount} on {self.date}"
     
@@ -86,4 +100,95 @@ class NetWorth(models.Model):
         decimal_places=2,
         validators=[MinValueValidator(0.00), MaxValueValidator(10000000000.00)],
     )
-    date = models.DateField()
\ No newline at end of file
+    date = models.DateField()
+
+    class Meta:
+        ordering = ["date"]
+        constraints = [
+            # One snapshot per user and day; its index also serves the per-user date range scans.
+            models.UniqueConstraint(
+                fields=["user_name", "date"], name="unique_net_worth_snapshot_per_day"
+            ),
+        ]
+
+
+class SnapshotRollup(models.Model):
+    """Weekly or monthly open/close/min/max of a daily snapshot series, maintained by functions/rollups.py."""
+
+    PERIOD_CHOICES = [
+        ("week", "Week"),
+        ("month", "Month"),
+    ]
+
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    period_start = models.DateField()
+    open = models.DecimalField(max_digits=15, decimal_places=2)
+    close = models.DecimalField(max_digits=15, decimal_places=2)
+    low = models.DecimalField(max_digits=15, decimal_places=2)
+    high = models.DecimalField(max_digits=15, decimal_places=2)
+
+    class Meta:
+        abstract = True
+        ordering = ["period_start"]
+
+    def __str__(self):
+        return f"{self.period} of {self.period_start}: {self.close}"
+
+
+class InvestmentsRollup(SnapshotRollup):
+    user_name = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="investments_rollups"
+    )
+
+    class Meta(SnapshotRollup.Meta):
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user_name", "period", "period_start"],
+                name="unique_investments_rollup_per_period",
+            ),
+        ]
+
+
+class NetWorthRollup(SnapshotRollup):
+    user_name = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="net_worth_rollups"
+    )
+
+    class Meta(SnapshotRollup.Meta):
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user_name", "period", "period_start"],
+                name="unique_net_worth_rollup_per_period",
+            ),
+        ]
+
+
+class Job(models.Model):
+    """A queued background job of a user, run by `manage.py run_worker` (see functions/jobs.py).
+    Finished jobs are deleted, failed ones are kept with their traceback.
+    """
+
+    user_name = models.ForeignKey(User, on_delete=models.CASCADE, related_name="jobs")
+    kind = models.CharField(max_length=30, choices=JOB_KIND_CHOICES)
+    status = models.CharField(
+        max_length=10, choices=JOB_STATUS_CHOICES, default=JOB_PENDING
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        constraints = [
+            # At most one waiting job of each kind per user; enqueueing another one is a no-op.
+            models.UniqueConstraint(
+                fields=["user_name", "kind"],
+                condition=models.Q(status=JOB_PENDING),
+                name="unique_pending_job_per_user",
+            ),
+        ]
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+    def __str__(self):
+        return f"{self.kind} of {self.user_name} ({self.status})"
@@ -0,0 +1,55 @@
+// Updates the budget pie chart in place while the budget form is edited.
+// The form data is posted to the preview endpoint, which answers with the chart slices
+// (or the rendered SVG chart for ?chart=svg), instead of submitting the whole page.
+// <div data-preview-url="..." data-template-id="..." data-form-id="..."></div>
+(function () {
+    const DELAY_MS = 250;
+
+    function updateChart(container, form, errorElement) {
+        fetch(container.dataset.previewUrl, {
+            method: "POST",
+            body: new FormData(form),
+            credentials: "same-origin",
+        })
+            .then((response) => response.json().then((preview) => [response.ok, preview]))
+            .then(([ok, preview]) => {
+                if (!ok) {
+                    errorElement.textContent = Object.values(preview.errors)
+                        .flat()
+                        .map((error) => error.message)
+                        .join(" ");
+                    return;
+                }
+                errorElement.textContent = "";
+                if (preview.svg !== undefined) {
+                    container.innerHTML = preview.svg;
+                    return;
+                }
+                if (!container.dataset.rendered) {
+                    container.innerHTML = ""; // The chart of the last full form post
+                    container.dataset.rendered = "true";
+                }
+                const figure = JSON.parse(
+                    document.getElementById(container.dataset.templateId).textContent
+                );
+                figure.data[0].labels = preview.labels;
+                figure.data[0].values = preview.values;
+                Plotly.react(container, figure.data, figure.layout);
+            });
+    }
+
+    document.querySelectorAll("[data-preview-url]").forEach((container) => {
+        const form = document.getElementById(container.dataset.formId);
+        const errorElement = document.createElement("p");
+        errorElement.className = "preview-error";
+        container.before(errorElement);
+
+        let timer = null;
+        const scheduleUpdate = () => {
+            clearTimeout(timer);
+            timer = setTimeout(() => updateChart(container, form, errorElement), DELAY_MS);
+        };
+        form.addEventListener("input", scheduleUpdate);
+        form.addEventListener("change", scheduleUpdate);
+    });
+})();
@@ -0,0 +1,44 @@
+// Renders line charts in the browser from the JSON series endpoints.
+// Each chart container declares the series URL and the id of its json_script layout:
+// <div data-series-url="..." data-layout-id="..."></div>
+// Buttons with a data-range attribute in the same section switch the time window (30d, 1y, all).
+(function () {
+    function renderLineChart(container, range) {
+        const layout = JSON.parse(
+            document.getElementById(container.dataset.layoutId).textContent
+        );
+        const url = new URL(container.dataset.seriesUrl, window.location.href);
+        url.searchParams.set("range", range);
+
+        fetch(url, { credentials: "same-origin" })
+            .then((response) => response.json())
+            .then((series) => {
+                if (!series.x.length && !container.dataset.rendered) {
+                    return;
+                }
+                container.dataset.rendered = "true";
+                Plotly.react(
+                    container,
+                    [
+                        {
+                            type: "scatter",
+                            mode: "lines+markers",
+                            x: series.x,
+                            y: series.y,
+                        },
+                    ],
+                    layout
+                );
+            });
+    }
+
+    document.querySelectorAll("[data-series-url]").forEach((container) => {
+        const section = container.closest("section") || document;
+        section.querySelectorAll("[data-range]").forEach((button) => {
+            button.addEventListener("click", () =>
+                renderLineChart(container, button.dataset.range)
+            );
+        });
+        renderLineChart(container, "all");
+    });
+})();
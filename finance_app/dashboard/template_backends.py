@@ -0,0 +1,21 @@
+from django.template.backends.django import DjangoTemplates, Template
+
+from .functions.request_timing import measure
+
+
+class TimedTemplate(Template):
+    """Template whose rendering time is reported by the performance middleware."""
+
+    def render(self, context=None, request=None):
+        with measure("tpl"):
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The regular Django template backend, timing each top-level template render."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
@@ -0,0 +1,12 @@
+from django import template
+from django.templatetags.static import static
+
+from ..functions.plotly_assets import plotly_js_static_name
+
+register = template.Library()
+
+
+@register.simple_tag
+def plotly_js_url():
+    """Returns the STATIC_URL path of the content-hashed plotly.js bundle."""
+    return static(plotly_js_static_name())
@@ -0,0 +1,24 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """Runs the tests with the node-wide metrics store in a temporary directory,
+    so the test requests are not counted in the real METRICS_DATABASE.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._metrics_directory = tempfile.TemporaryDirectory()
+        self._metrics_database = settings.METRICS_DATABASE
+        settings.METRICS_DATABASE = os.path.join(
+            self._metrics_directory.name, "metrics.sqlite3"
+        )
+
+    def teardown_test_environment(self, **kwargs):
+        settings.METRICS_DATABASE = self._metrics_database
+        self._metrics_directory.cleanup()
+        super().teardown_test_environment(**kwargs)
@@ -1,3 +1,1221 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import os
+import pstats
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import IntegrityError, connection, connections, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from .functions.amortization import project_loans
+from .functions.benchmarking import (
+    benchmark_scenarios,
+    budget_post_data,
+    import_post_data,
+    portfolio_post_data,
+    uncovered_routes,
+)
+from .functions.chart_cache import bump_data_version
+from .functions.csv_import import import_csv
+from .functions.dashboard_summary import dashboard_summary
+from .functions.data_export import aexport_chunks, export_chunks, export_user_to_file
+from .functions.downsampling import downsample_series, lttb_indices, min_max_indices
+from .functions.financial_aggregates import (
+    aloan_summary,
+    calculate_net_worth,
+    loan_summary,
+)
+from .functions.figure_spec import line_figure, pie_figure, to_json
+from .functions.jobs import claim_jobs, enqueue_job, run_job
+from .functions.line_chart import LineChartBuilder, snapshot_series
+from .functions.metrics import flush, increment, observe, render_prometheus
+from .functions.monte_carlo import simulate_portfolio
+from .functions.net_worth import snapshot_all_users
+from .functions.pieChart import PieChartBuilder
+from .functions.projection import project_portfolio
+from .functions.rollups import (
+    ROLLUP_PERIODS,
+    choose_rollup_period,
+    period_start,
+    rebuild_rollups,
+    rollup_queryset,
+)
+from .functions.seeding import seed_users
+from .functions.snapshots import record_investments_snapshot, upsert_snapshots
+from .functions.svg_charts import render_svg
+from .list_and_dictionaries.statuses import (
+    JOB_PENDING,
+    JOB_RUNNING,
+    PRERENDER_CHARTS,
+    RECOMPUTE_SNAPSHOT,
+)
+from .management.commands import bench_startup
+from .models import (
+    Budget,
+    Category,
+    Investment,
+    InvestmentsThroughTime,
+    Job,
+    Loans,
+    NetWorth,
+    NetWorthRollup,
+)
+
+# Exact number of queries of every benchmark scenario (see functions/benchmarking.py),
+# session and user lookups included. They must not depend on how much data the user has.
+QUERY_BUDGETS = {
+    "dashboard": 4,
+    "budget_creation": 2,
+    "budget_creation submit_budget": 2,
+    "budget_creation save_budget": 8,
+    "api_budget_preview": 2,
+    "your_budget": 4,
+    "budget_detail": 4,
+    "budget_delete": 6,
+    "loans": 4,
+    "loans add": 6,
+    "loans projection": 4,
+    "loan_delete": 6,
+    "portfolio_creation": 3,
+    "portfolio_creation submit_portfolio": 6,
+    "portfolio_creation save_portfolio_value": 10,
+    "net_worth": 2,
+    "import_data": 2,
+    "import_data loans": 6,
+    "import_data investments": 6,
+    "export_data": 7,
+    "export_data ndjson": 7,
+    "net_worth svg": 4,
+    "portfolio_creation svg": 5,
+    "budget_detail svg": 4,
+    "chart_image": 2,
+    "api_net_worth_series 30d": 4,
+    "api_net_worth_series 1y": 4,
+    "api_net_worth_series all": 4,
+    "api_investment_series 30d": 4,
+    "api_investment_series 1y": 4,
+    "api_investment_series all": 4,
+}
+
+
+@override_settings(PROJECTION_PATHS=200)  # The portfolio pages run a projection
+class QueryBudgetTests(TestCase):
+    """Pins the query count of every dashboard view and action, for a user with little data
+    and for a user with a lot of it, so N+1 patterns and row-by-row writes fail here.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        (cls.small_user,) = seed_users(
+            users=1,
+            budgets=1,
+            allocations=1,
+            loans=1,
+            investments=1,
+            days=3,
+            prefix="small_user_",
+        )
+        (cls.large_user,) = seed_users(
+            users=1,
+            budgets=10,
+            allocations=8,
+            loans=30,
+            investments=50,
+            days=2 * 365,
+            prefix="large_user_",
+        )
+
+    def setUp(self):
+        caches[settings.CHART_CACHE_ALIAS].clear()
+
+    def assert_query_budgets(self, user):
+        self.client.force_login(user)
+        for name, url_name, method, path, data in benchmark_scenarios(user):
+            with self.subTest(scenario=name):
+                bump_data_version(user)  # Cold chart cache
+                # Every scenario starts from the seeded data
+                with transaction.atomic():
+                    with self.assertNumQueries(QUERY_BUDGETS[name]):
+                        response = getattr(self.client, method)(path, data)
+                        response.getvalue()  # Streamed responses query as they are read
+                    transaction.set_rollback(True)
+                self.assertLess(response.status_code, 400)
+
+    def test_query_budgets_with_little_data(self):
+        self.assert_query_budgets(self.small_user)
+
+    def test_query_budgets_with_a_lot_of_data(self):
+        self.assert_query_budgets(self.large_user)
+
+    def test_every_route_has_a_budget(self):
+        scenarios = benchmark_scenarios(self.large_user)
+        self.assertEqual(uncovered_routes(scenarios), [])
+        self.assertEqual({scenario[0] for scenario in scenarios}, set(QUERY_BUDGETS))
+
+
+class BulkWriteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            "bulk_user", password="password"
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def budget_data(self):
+        data = budget_post_data("save_budget", allocations=3)
+        for i, (category, percentage) in enumerate(
+            [("food", "20"), ("savings", "30"), ("education", "50")]
+        ):
+            data[f"allocations-{i}-category"] = category
+            data[f"allocations-{i}-percentage"] = percentage
+        return data
+
+    def test_budget_and_allocations(self):
+        self.client.post(reverse("budget_creation"), self.budget_data())
+        budget = Budget.objects.get(user_name=self.user)
+        self.assertEqual(budget.amount, Decimal("5000.00"))
+        self.assertEqual(
+            list(
+                budget.allocations.order_by("pk").values_list(
+                    "category_name", "percentage"
+                )
+            ),
+            [
+                ("food", Decimal("20.00")),
+                ("savings", Decimal("30.00")),
+                ("education", Decimal("50.00")),
+            ],
+        )
+
+        # A second budget of the same name is refused
+        response = self.client.post(reverse("budget_creation"), self.budget_data())
+        self.assertEqual(
+            response.context["message"], "A budget with this name already exists."
+        )
+        self.assertEqual(Budget.objects.filter(user_name=self.user).count(), 1)
+
+    def test_budget_is_not_saved_without_its_allocations(self):
+        with mock.patch.object(
+            Category.objects, "bulk_create", side_effect=IntegrityError
+        ):
+            with self.assertRaises(IntegrityError):
+                self.client.post(reverse("budget_creation"), self.budget_data())
+        self.assertFalse(Budget.objects.filter(user_name=self.user).exists())
+
+    @override_settings(PROJECTION_PATHS=200)
+    def test_investments_and_portfolio_value(self):
+        self.client.post(
+            reverse("portfolio_creation"),
+            portfolio_post_data("save_portfolio_value", investments=3),
+        )
+        self.assertEqual(
+            list(
+                Investment.objects.filter(user_name=self.user).values_list(
+                    "amount", flat=True
+                )
+            ),
+            [Decimal("1000.00")] * 3,
+        )
+        self.assertEqual(
+            InvestmentsThroughTime.objects.get(user_name=self.user).amount,
+            Decimal("3000.00"),
+        )
+
+
+class NetWorthSnapshotTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.user = User.objects.create_user("snapshot_user", password="password")
+        cls.new_user = User.objects.create_user(
+            "snapshot_new_user", password="password"
+        )
+        cls.today = date.today()
+        Loans.objects.bulk_create(
+            [
+                Loans(
+                    user_name=cls.user,
+                    loan_name=name,
+                    amount=amount,
+                    interest_rate=Decimal("4.00"),
+                    due_date=date(2035, 1, 1),
+                )
+                for name, amount in (
+                    ("Car", Decimal("1000.50")),
+                    ("Phone", Decimal("250.00")),
+                )
+            ]
+        )
+        InvestmentsThroughTime.objects.bulk_create(
+            [
+                InvestmentsThroughTime(
+                    user_name=cls.user,
+                    amount=Decimal("5000.00"),
+                    date=cls.today - timedelta(days=1),
+                ),
+                InvestmentsThroughTime(
+                    user_name=cls.user, amount=Decimal("8000.00"), date=cls.today
+                ),
+            ]
+        )
+
+    def test_snapshot_all_users(self):
+        # One user per batch
+        self.assertEqual(snapshot_all_users(self.today, batch_size=1), 2)
+        self.assertEqual(
+            dict(NetWorth.objects.values_list("user_name", "total_net_worth")),
+            {self.user.pk: Decimal("6749.50"), self.new_user.pk: Decimal("0.00")},
+        )
+
+        # Running it again the same day overwrites the day's snapshots
+        Loans.objects.filter(user_name=self.user, loan_name="Phone").delete()
+        self.assertEqual(snapshot_all_users(self.today), 2)
+        self.assertEqual(NetWorth.objects.count(), 2)
+        self.assertEqual(
+            NetWorth.objects.get(user_name=self.user).total_net_worth,
+            Decimal("6999.50"),
+        )
+
+    def test_cached_svg_chart_follows_the_command(self):
+        caches[settings.CHART_CACHE_ALIAS].clear()
+        snapshot_all_users(self.today - timedelta(days=1))
+        self.client.force_login(self.user)
+        url = f"{reverse('net_worth')}?chart=svg"
+        before = self.client.get(url).context["line_chart"]
+
+        call_command("snapshot_net_worth", stdout=io.StringIO())
+        self.assertNotEqual(self.client.get(url).context["line_chart"], before)
+
+
+class SnapshotUpsertTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            "upsert_user", password="password"
+        )
+
+    def test_second_snapshot_of_a_day_updates_the_row(self):
+        today = date.today()
+        record_investments_snapshot(self.user, Decimal("100.00"), today)
+        first = InvestmentsThroughTime.objects.get(user_name=self.user)
+        record_investments_snapshot(self.user, Decimal("250.00"), today)
+        record_investments_snapshot(
+            self.user, Decimal("50.00"), today - timedelta(days=1)
+        )
+
+        self.assertEqual(
+            list(
+                InvestmentsThroughTime.objects.filter(user_name=self.user).values_list(
+                    "date", "amount"
+                )
+            ),
+            [
+                (today - timedelta(days=1), Decimal("50.00")),
+                (today, Decimal("250.00")),
+            ],
+        )
+        # Updated in place
+        self.assertEqual(
+            InvestmentsThroughTime.objects.get(user_name=self.user, date=today).pk,
+            first.pk,
+        )
+
+
+class SnapshotMigrationTests(TransactionTestCase):
+    """Runs migration 0011 over duplicate snapshot days."""
+
+    before = [("dashboard", "0010_alter_networth_date")]
+    after = [("dashboard", "0011_snapshot_per_day_constraints")]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_duplicate_days_keep_their_latest_row(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        apps = executor.loader.project_state(self.before).apps
+        User = apps.get_model(settings.AUTH_USER_MODEL)
+        NetWorth = apps.get_model("dashboard", "NetWorth")
+        user = User.objects.create(username="duplicate_user")
+        today = date.today()
+        for day, total in [
+            (today, "1.00"),
+            (today, "2.00"),
+            (today - timedelta(days=1), "3.00"),
+            (today, "4.00"),
+        ]:
+            NetWorth.objects.create(user_name=user, date=day, total_net_worth=total)
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.after)
+        NetWorth = executor.loader.project_state(self.after).apps.get_model(
+            "dashboard", "NetWorth"
+        )
+        self.assertEqual(
+            list(
+                NetWorth.objects.order_by("date").values_list("date", "total_net_worth")
+            ),
+            [
+                (today - timedelta(days=1), Decimal("3.00")),
+                (today, Decimal("4.00")),
+            ],
+        )
+
+
+class RollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        (cls.user,) = seed_users(users=1, budgets=0, loans=0, investments=0, days=400)
+
+    def rollups_from_daily_rows(self, period):
+        """open/close/low/high of every period, computed from the daily net worth rows."""
+        buckets = {}
+        for day, value in (
+            NetWorth.objects.filter(user_name=self.user)
+            .order_by("date")
+            .values_list("date", "total_net_worth")
+        ):
+            buckets.setdefault(period_start(day, period), []).append(value)
+        return {
+            start: (values[0], values[-1], min(values), max(values))
+            for start, values in buckets.items()
+        }
+
+    def assert_rollups_match_daily_rows(self):
+        for period in ROLLUP_PERIODS:
+            with self.subTest(period=period):
+                rollups = rollup_queryset(NetWorth, self.user, period).values_list(
+                    "period_start", "open", "close", "low", "high"
+                )
+                self.assertEqual(
+                    {start: tuple(values) for start, *values in rollups},
+                    self.rollups_from_daily_rows(period),
+                )
+
+    def test_rebuild(self):
+        NetWorthRollup.objects.all().delete()
+        periods = sum(
+            len(self.rollups_from_daily_rows(period)) for period in ROLLUP_PERIODS
+        )
+        self.assertEqual(rebuild_rollups(NetWorth, batch_size=10), periods)
+        self.assert_rollups_match_daily_rows()
+
+    def test_refresh_after_upsert(self):
+        last_day = NetWorth.objects.filter(user_name=self.user).latest("date").date
+        upsert_snapshots(
+            NetWorth,
+            [
+                NetWorth(user_name=self.user, total_net_worth=123456, date=last_day),
+                NetWorth(
+                    user_name=self.user,
+                    total_net_worth=-5,
+                    date=last_day + timedelta(days=1),
+                ),
+            ],
+            "total_net_worth",
+        )
+        self.assert_rollups_match_daily_rows()
+
+    def test_rollups_only_when_the_daily_rows_do_not_fit(self):
+        self.assertIsNone(choose_rollup_period(365, 365, 500))
+        self.assertEqual(choose_rollup_period(365, 365, 100), "week")
+        self.assertEqual(choose_rollup_period(365, 365, 20), "month")
+        self.assertEqual(choose_rollup_period(365, 365, 5), "month")
+
+        daily = self.rollups_from_daily_rows("week")
+        series = snapshot_series(NetWorth, self.user, "all", max_points=400)
+        self.assertEqual(len(series["x"]), 400)
+        series = snapshot_series(NetWorth, self.user, "all", max_points=399)
+        self.assertEqual(series["x"], list(daily))
+        self.assertEqual(series["y"], [close for _, close, _, _ in daily.values()])
+        series = snapshot_series(NetWorth, self.user, "all", max_points=20)
+        self.assertEqual(series["x"], list(self.rollups_from_daily_rows("month")))
+        series = snapshot_series(NetWorth, self.user, "all", max_points=5)
+        self.assertEqual(len(series["x"]), 5)
+
+
+class DownsamplingTests(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.x = np.arange(1000, dtype=np.float64)
+        self.y = rng.normal(size=1000).cumsum()
+        self.y[123], self.y[456] = 1000, -1000  # A spike and a drop
+
+    def assert_valid_indices(self, indices, max_points):
+        self.assertLessEqual(len(indices), max_points)
+        self.assertTrue((np.diff(indices) > 0).all())
+
+    def test_lttb(self):
+        for max_points in (3, 10, 100, 999):
+            with self.subTest(max_points=max_points):
+                indices = lttb_indices(self.x, self.y, max_points)
+                self.assert_valid_indices(indices, max_points)
+                self.assertEqual((indices[0], indices[-1]), (0, 999))
+
+    def test_min_max_keeps_extremes(self):
+        for max_points in (2, 10, 100, 999):
+            with self.subTest(max_points=max_points):
+                indices = min_max_indices(self.y, max_points)
+                self.assert_valid_indices(indices, max_points)
+                self.assertIn(123, indices)
+                self.assertIn(456, indices)
+
+    def test_short_series_are_unchanged(self):
+        everything = np.arange(1000)
+        np.testing.assert_array_equal(lttb_indices(self.x, self.y, 1000), everything)
+        np.testing.assert_array_equal(lttb_indices(self.x, self.y, 2), everything)
+        np.testing.assert_array_equal(min_max_indices(self.y, 1), everything)
+
+        series = {
+            "x": [date(2024, 1, 1) + timedelta(days=day) for day in range(1000)],
+            "y": list(self.y),
+        }
+        self.assertIs(downsample_series(series, 1000), series)
+        downsampled = downsample_series(series, 100)
+        self.assertEqual(len(downsampled["x"]), 100)
+        self.assertEqual(
+            (downsampled["x"][0], downsampled["x"][-1]),
+            (series["x"][0], series["x"][-1]),
+        )
+
+
+class SeriesAPITests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        (cls.user,) = seed_users(users=1, budgets=0, loans=0, investments=0, days=400)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def series(self, **params):
+        return self.client.get(reverse("api_net_worth_series"), params).json()
+
+    def test_points(self):
+        self.assertEqual(len(self.series(range="all", points=400)["x"]), 400)
+        self.assertEqual(len(self.series(range="1y", points=5000)["x"]), 366)
+        weeks = self.series(range="all", points=100)["x"]
+        self.assertLessEqual(len(weeks), 100)
+        self.assertEqual({date.fromisoformat(day).weekday() for day in weeks}, {0})
+        self.assertEqual(len(self.series(range="all", points=3)["y"]), 3)
+
+    def test_invalid_parameters(self):
+        url = reverse("api_net_worth_series")
+        for params in (
+            {"range": "2y"},
+            {"points": 2},
+            {"points": 5001},
+            {"points": "many"},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", response.json())
+
+    def test_etag(self):
+        # Daily rows, then weekly rollups
+        urls = [
+            f"{reverse('api_net_worth_series')}?range=all&points={points}"
+            for points in (400, 100)
+        ]
+        etags = {}
+        for url in urls:
+            response = self.client.get(url)
+            etags[url] = response["ETag"]
+            self.assertIn("no-cache", response["Cache-Control"])
+            response = self.client.get(url, headers={"if-none-match": etags[url]})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.content, b"")
+
+        # Writing a snapshot changes the ETag and the series
+        last_day = NetWorth.objects.filter(user_name=self.user).latest("date").date
+        upsert_snapshots(
+            NetWorth,
+            [NetWorth(user_name=self.user, total_net_worth=123456, date=last_day)],
+            "total_net_worth",
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url, headers={"if-none-match": etags[url]})
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response["ETag"], etags[url])
+                self.assertEqual(response.json()["y"][-1], 123456.0)
+
+
+class LoanSummaryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.user = User.objects.create_user("loan_summary_user", password="password")
+        cls.new_user = User.objects.create_user(
+            "loan_summary_new_user", password="password"
+        )
+        Loans.objects.bulk_create(
+            [
+                Loans(
+                    user_name=cls.user,
+                    loan_name=name,
+                    amount=Decimal(amount),
+                    interest_rate=Decimal(rate),
+                    due_date=date(2035, 1, 1),
+                )
+                for name, amount, rate in (
+                    ("Car", "1000.00", "5.00"),
+                    ("Student", "3000.00", "3.00"),
+                    ("Phone", "500.50", "7.25"),
+                )
+            ]
+        )
+        InvestmentsThroughTime.objects.create(
+            user_name=cls.user, amount=Decimal("8000.00"), date=date.today()
+        )
+
+    def test_totals_and_weighted_rate(self):
+        # (1000 * 5 + 3000 * 3 + 500.50 * 7.25) / 4500.50 = 3.917...
+        expected = {
+            "total_amount": Decimal("4500.50"),
+            "loan_count": 3,
+            "average_interest_rate": Decimal("3.92"),
+        }
+        self.assertEqual(loan_summary(self.user), expected)
+        self.assertEqual(async_to_sync(aloan_summary)(self.user), expected)
+        self.assertEqual(calculate_net_worth(self.user), Decimal("3499.50"))
+
+    def test_user_without_loans(self):
+        self.assertEqual(
+            loan_summary(self.new_user),
+            {
+                "total_amount": Decimal("0.00"),
+                "loan_count": 0,
+                "average_interest_rate": Decimal("0.00"),
+            },
+        )
+        self.assertEqual(calculate_net_worth(self.new_user), Decimal("0.00"))
+
+
+@override_settings(PROJECTION_PATHS=200)
+class DashboardSummaryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, cls.new_user = seed_users(
+            users=2, budgets=3, loans=4, investments=2, days=40
+        )
+        for model in (Budget, Loans, InvestmentsThroughTime, NetWorth):
+            model.objects.filter(user_name=cls.new_user).delete()
+
+    def test_summary(self):
+        summary = async_to_sync(dashboard_summary)(self.user)
+        latest = NetWorth.objects.filter(user_name=self.user).latest("date")
+        self.assertEqual(summary["loans"], loan_summary(self.user))
+        self.assertEqual(summary["budget_count"], 3)
+        self.assertEqual(
+            summary["latest_net_worth"],
+            {"total_net_worth": latest.total_net_worth, "date": latest.date},
+        )
+        self.assertEqual(
+            str(summary["latest_net_worth"]["total_net_worth"]),
+            str(latest.total_net_worth),
+        )
+        self.assertEqual(
+            summary["latest_investments"]["amount"],
+            InvestmentsThroughTime.objects.filter(user_name=self.user)
+            .latest("date")
+            .amount,
+        )
+        self.assertIn("<svg", summary["net_worth_chart"])
+
+    def test_user_without_data(self):
+        summary = async_to_sync(dashboard_summary)(self.new_user)
+        self.assertEqual(summary["loans"], loan_summary(self.new_user))
+        self.assertEqual(summary["budget_count"], 0)
+        self.assertIsNone(summary["latest_net_worth"])
+        self.assertIsNone(summary["latest_investments"])
+        self.assertIsNone(summary["net_worth_chart"])
+
+
+@override_settings(PROJECTION_PATHS=200)
+class ChartCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        (cls.user,) = seed_users(users=1, budgets=1, loans=2, investments=3, days=30)
+
+    def setUp(self):
+        caches[settings.CHART_CACHE_ALIAS].clear()
+        self.client.force_login(self.user)
+
+    def test_new_investments_invalidate_the_projection_chart(self):
+        url = f"{reverse('portfolio_creation')}?chart=svg"
+        before = self.client.get(url).context["projection_chart"]
+        self.assertEqual(self.client.get(url).context["projection_chart"], before)
+
+        self.client.post(
+            reverse("portfolio_creation"),
+            portfolio_post_data("submit_portfolio", investments=2),
+        )
+        self.assertNotEqual(self.client.get(url).context["projection_chart"], before)
+
+    @override_settings(JOBS_RUN_EAGERLY=True)
+    def test_new_loans_invalidate_the_net_worth_chart(self):
+        url = f"{reverse('net_worth')}?chart=svg"
+        before = self.client.get(url).context["line_chart"]
+
+        self.client.post(
+            reverse("loans"),
+            {
+                "loan-loan_name": "New loan",
+                "loan-amount": "10000",
+                "loan-interest_rate": "4.5",
+                "loan-due_date": "2035-01-01",
+            },
+        )
+        self.assertNotEqual(self.client.get(url).context["line_chart"], before)
+
+
+class ServerTimingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        (cls.user,) = seed_users(users=1, budgets=1, loans=2, investments=3, days=30)
+
+    def setUp(self):
+        caches[settings.CHART_CACHE_ALIAS].clear()
+
+    def assert_server_timing(self, response, queries):
+        timings = {}
+        for metric in response["Server-Timing"].split(", "):
+            name, duration, description = metric.split(";")
+            timings[name] = (
+                float(duration.removeprefix("dur=")),
+                description.removeprefix("desc=").strip('"'),
+            )
+        self.assertEqual(list(timings), ["total", "db", "tpl", "chart"])
+        self.assertEqual(timings["db"][1], f"Database ({queries} queries)")
+        for phase in ("db", "tpl", "chart"):
+            with self.subTest(phase=phase):
+                self.assertGreater(timings[phase][0], 0)
+                self.assertLessEqual(timings[phase][0], timings["total"][0])
+
+    def test_sync_view(self):
+        self.client.force_login(self.user)
+        # Pie chart and projection chart
+        response = self.client.get(reverse("portfolio_creation"))
+        self.assert_server_timing(response, QUERY_BUDGETS["portfolio_creation"])
+
+    async def test_async_view(self):
+        await self.async_client.aforce_login(self.user)
+        # The SVG chart is built in a worker thread
+        response = await self.async_client.get(reverse("net_worth"), {"chart": "svg"})
+        self.assert_server_timing(response, QUERY_BUDGETS["net_worth svg"])
+
+
+class ProfilerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        (cls.user,) = seed_users(users=1, budgets=1, loans=1, investments=0, days=0)
+        cls.staff = get_user_model().objects.create(username="staff", is_staff=True)
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.profile_dir = directory.name
+        override = override_settings(PROFILE_DIR=self.profile_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_only_staff_requests_are_profiled(self):
+        self.client.force_login(self.user)
+        for url in (reverse("budget_creation"), reverse("loans")):  # Sync and async
+            with self.subTest(url=url):
+                response = self.client.get(url, {"profile": "1"})
+                self.assertEqual(response.status_code, 200)
+                self.assertNotIn("X-Profile-Id", response)
+                response = self.client.get(url, headers={"x-profile": "1"})
+                self.assertNotIn("X-Profile-Id", response)
+        self.assertEqual(os.listdir(self.profile_dir), [])
+
+    def test_profile_files(self):
+        self.client.force_login(self.staff)
+        names = []
+        for url in (reverse("budget_creation"), reverse("loans")):  # Sync and async
+            with self.subTest(url=url):
+                name = self.client.get(url, {"profile": "1"})["X-Profile-Id"]
+                path = os.path.join(self.profile_dir, name)
+                pstats.Stats(f"{path}.prof")  # Readable cProfile stats
+                self.assertTrue(os.path.exists(f"{path}.collapsed.txt"))
+                with open(f"{path}.sql.txt") as file:
+                    self.assertRegex(file.readline(), r"^-- \d+ statements")
+                names.append(name)
+        # The async ORM queries are recorded too
+        with open(os.path.join(self.profile_dir, f"{names[1]}.sql.txt")) as file:
+            self.assertIn("dashboard_loans", file.read())
+        self.assertEqual(
+            sorted(os.listdir(self.profile_dir)),
+            sorted(
+                f"{name}{suffix}"
+                for name in names
+                for suffix in (".prof", ".collapsed.txt", ".sql.txt")
+            ),
+        )
+
+
+class SqliteProfileTests(TestCase):
+    def init_command(self, profile):
+        """Returns the init_command of the settings loaded with FINANCE_APP_SQLITE_PROFILE=profile."""
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "from finance_app import settings; "
+                "print(settings.DATABASES['default']['OPTIONS']['init_command'])",
+            ],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, "FINANCE_APP_SQLITE_PROFILE": profile},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return result.stdout.strip()
+
+    def test_profile_is_chosen_from_the_environment(self):
+        self.assertEqual(self.init_command("default"), "")
+        wal = self.init_command("wal").split(";")
+        self.assertIn("PRAGMA busy_timeout=5000", wal)
+        self.assertIn("PRAGMA synchronous=NORMAL", wal)
+        # Stored in the database file, set by apply_sqlite_profile only
+        self.assertFalse([pragma for pragma in wal if "journal_mode" in pragma])
+
+    def test_connections_get_the_profile_pragmas(self):
+        pragmas = settings.SQLITE_PROFILES[settings.SQLITE_PROFILE]
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], pragmas.get("busy_timeout", 0))
+            cursor.execute("PRAGMA cache_size")
+            self.assertEqual(cursor.fetchone()[0], pragmas.get("cache_size", -2000))
+
+    def test_apply_sqlite_profile(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profile.sqlite3")
+            connections["profile"] = type(connections["default"])(
+                {**connection.settings_dict, "NAME": path}, "profile"
+            )
+            try:
+                for profile, journal_mode in (("wal", "wal"), ("default", "delete")):
+                    with self.settings(SQLITE_PROFILE=profile):
+                        call_command(
+                            "apply_sqlite_profile",
+                            database="profile",
+                            stdout=io.StringIO(),
+                        )
+                    with closing(sqlite3.connect(path)) as file:
+                        self.assertEqual(
+                            file.execute("PRAGMA journal_mode").fetchone()[0],
+                            journal_mode,
+                        )
+            finally:
+                connections["profile"].close()
+                del connections["profile"]
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        flush()  # Counters of earlier tests' requests
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        database = os.path.join(directory.name, "metrics.sqlite3")
+        override = override_settings(METRICS_DATABASE=database, METRICS_TOKEN="")
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_histograms_and_hit_ratio(self):
+        for seconds in (0.25, 0.5):
+            observe(
+                "finance_app_request_duration_seconds",
+                seconds,
+                [0.1, 0.25, 1],
+                url_name="loans",
+            )
+        increment("finance_app_chart_cache_requests_total", chart="pie", result="miss")
+        flush()  # Another worker's counters add up with these
+        increment(
+            "finance_app_chart_cache_requests_total", 3, chart="pie", result="hit"
+        )
+
+        lines = render_prometheus().splitlines()
+        for line in [
+            "# TYPE finance_app_request_duration_seconds histogram",
+            'finance_app_request_duration_seconds_bucket{url_name="loans",le="0.1"} 0',
+            'finance_app_request_duration_seconds_bucket{url_name="loans",le="0.25"} 1',
+            'finance_app_request_duration_seconds_bucket{url_name="loans",le="1"} 2',
+            'finance_app_request_duration_seconds_bucket{url_name="loans",le="+Inf"} 2',
+            'finance_app_request_duration_seconds_sum{url_name="loans"} 0.75',
+            'finance_app_request_duration_seconds_count{url_name="loans"} 2',
+            'finance_app_chart_cache_requests_total{chart="pie",result="hit"} 3',
+            'finance_app_chart_cache_hit_ratio{chart="pie"} 0.75',
+        ]:
+            self.assertIn(line, lines)
+
+    def test_access(self):
+        url = reverse("metrics")
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(
+            self.client.get(url, REMOTE_ADDR="203.0.113.7").status_code, 404
+        )
+        with self.settings(METRICS_TOKEN="secret"):
+            self.assertEqual(self.client.get(url).status_code, 404)
+            response = self.client.get(url, headers={"authorization": "Bearer secret"})
+            self.assertEqual(response.status_code, 200)
+
+
+class JobQueueTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        (cls.user,) = seed_users(users=1, budgets=2, loans=2, investments=2, days=30)
+
+    def test_pending_jobs_are_deduplicated_per_user(self):
+        enqueue_job(self.user, RECOMPUTE_SNAPSHOT)
+        enqueue_job(self.user, RECOMPUTE_SNAPSHOT)
+        enqueue_job(self.user, PRERENDER_CHARTS)
+        self.assertEqual(Job.objects.filter(status=JOB_PENDING).count(), 2)
+
+        # A running job may have missed the change, so a new one can be queued
+        claim_jobs(limit=2)
+        enqueue_job(self.user, RECOMPUTE_SNAPSHOT)
+        self.assertEqual(
+            sorted(Job.objects.values_list("status", flat=True)),
+            [JOB_PENDING, JOB_RUNNING, JOB_RUNNING],
+        )
+
+    def test_recompute_snapshot_queues_prerendering(self):
+        NetWorth.objects.filter(user_name=self.user).delete()
+        enqueue_job(self.user, RECOMPUTE_SNAPSHOT)
+        results = []
+        while job_ids := claim_jobs(limit=10):
+            results += [run_job(job_id) for job_id in job_ids]
+
+        self.assertEqual(results, [True, True])  # The snapshot, then the charts
+        self.assertEqual(NetWorth.objects.filter(user_name=self.user).count(), 1)
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(PROJECTION_PATHS=200)
+    def test_portfolio_value_is_served_before_the_job_runs(self):
+        self.client.force_login(self.user)
+        # 30 daily rows do not fit in 10 points: served from the weekly rollups
+        url = f"{reverse('api_investment_series')}?range=all&points=10"
+        etag = self.client.get(url)["ETag"]
+        self.client.post(
+            reverse("portfolio_creation"),
+            portfolio_post_data("save_portfolio_value", investments=2),
+        )
+        response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.json()["y"][-1], 2000.0)
+
+        for job_id in claim_jobs(limit=10):
+            run_job(job_id)
+        response = self.client.get(url, headers={"if-none-match": response["ETag"]})
+        self.assertEqual(response.status_code, 304)
+
+    def test_svg_chart_is_rebuilt_after_the_job_runs(self):
+        caches[settings.CHART_CACHE_ALIAS].clear()
+        self.client.force_login(self.user)
+        url = f"{reverse('net_worth')}?chart=svg"
+        self.client.post(
+            reverse("loans"),
+            {
+                "loan-loan_name": "New loan",
+                "loan-amount": "10000",
+                "loan-interest_rate": "4.5",
+                "loan-due_date": "2035-01-01",
+            },
+        )
+        # Viewed before the worker stored the new snapshot, under the bumped data version
+        before = self.client.get(url).context["line_chart"]
+
+        for job_id in claim_jobs(limit=10):
+            run_job(job_id)
+        self.assertNotEqual(self.client.get(url).context["line_chart"], before)
+
+
+class AmortizationTests(TestCase):
+    start = date(2025, 1, 15)
+    loans = [
+        Loans(
+            loan_name="car", amount=10000, interest_rate=12, due_date=date(2026, 1, 15)
+        ),
+        Loans(
+            loan_name="card", amount=2000, interest_rate=20, due_date=date(2030, 1, 1)
+        ),
+        Loans(
+            loan_name="home", amount=90000, interest_rate=4, due_date=date(2045, 1, 1)
+        ),
+    ]
+
+    def test_minimum_payments_pay_off_by_the_due_date(self):
+        projection = project_loans(self.loans, start=self.start)
+        car = projection["loans"][0]
+        self.assertEqual(str(car["monthly_payment"]), "888.49")
+        self.assertEqual(car["payoff_date"], date(2026, 1, 15))
+        self.assertEqual(projection["months"], 240)
+        self.assertEqual(projection["balances"].shape, (241, 3))
+        self.assertEqual(projection["balances"][-1].sum(), 0)
+
+    def test_extra_payment_strategies(self):
+        minimum = project_loans(self.loans, start=self.start)
+        avalanche = project_loans(self.loans, "avalanche", 200, self.start)
+        snowball = project_loans(self.loans, "snowball", 200, self.start)
+        self.assertLess(avalanche["total_interest"], minimum["total_interest"])
+        self.assertLessEqual(avalanche["total_interest"], snowball["total_interest"])
+        self.assertLess(avalanche["months"], minimum["months"])
+        # The extra payment goes to the 20% card first, even though the car is due sooner
+        card, car = avalanche["loans"][1], avalanche["loans"][0]
+        self.assertLess(card["months"], minimum["loans"][1]["months"])
+        self.assertEqual(car["months"], 12)
+
+
+class ProjectionTests(TestCase):
+    def setUp(self):
+        caches[settings.CHART_CACHE_ALIAS].clear()
+
+    def test_chunks_give_the_same_result_in_any_executor(self):
+        arguments = ([1000, 500], [(0.07, 0.18), (0.03, 0.05)], 24, 1000, (10, 50, 90))
+        serial = simulate_portfolio(*arguments, chunk_size=300)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            pooled = simulate_portfolio(*arguments, chunk_size=300, executor=executor)
+        for percentile in (10, 50, 90):
+            self.assertEqual(serial[percentile].tolist(), pooled[percentile].tolist())
+        self.assertTrue((serial[10] <= serial[50]).all())
+        self.assertTrue((serial[50] <= serial[90]).all())
+
+    @override_settings(
+        PROJECTION_PATHS=100,
+        PROJECTION_YEARS=1,
+        PROJECTION_ASSUMPTIONS={"Bonds": (0.05, 0)},
+    )
+    def test_projection_bands(self):
+        totals = [{"category_name": "Bonds", "total_amount": Decimal("1000.00")}]
+        projection = project_portfolio(totals, start=date(2025, 1, 31))
+        self.assertEqual(len(projection["x"]), 13)
+        self.assertEqual(projection["x"][1], date(2025, 2, 28))
+        # Without volatility every path grows by the expected return
+        self.assertEqual(projection["y"][0], 1000)
+        self.assertEqual(projection["lower"][-1], 1050)
+        self.assertEqual(projection["upper"][-1], 1050)
+
+        svg = LineChartBuilder(projection, {}, renderer="svg").build_chart()
+        self.assertIn("<polygon", svg["line_chart"])
+
+
+class BudgetPreviewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        (cls.user,) = seed_users(users=1, budgets=0, loans=0, investments=0, days=0)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_slices_include_the_remainder(self):
+        data = budget_post_data("submit_budget", allocations=2)
+        data["allocations-1-category"] = "travel"
+        response = self.client.post(reverse("api_budget_preview"), data)
+        self.assertEqual(
+            response.json(),
+            {"labels": ["Food", "Travel", "Other"], "values": [250.0, 250.0, 4500.0]},
+        )
+        response = self.client.post(f"{reverse('api_budget_preview')}?chart=svg", data)
+        self.assertTrue(response.json()["svg"].startswith("<svg"))
+
+    def test_invalid_allocations(self):
+        data = budget_post_data("submit_budget", allocations=2)
+        data["allocations-0-percentage"] = "99"
+        response = self.client.post(reverse("api_budget_preview"), data)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("allocations", response.json()["errors"])
+
+        data["allocations-0-percentage"] = "-5"
+        response = self.client.post(reverse("api_budget_preview"), data)
+        self.assertIn("allocations-0-percentage", response.json()["errors"])
+
+
+class CsvImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        (cls.user,) = seed_users(users=1, budgets=0, loans=0, investments=0, days=0)
+
+    def import_lines(self, lines, kind="loans", batch_size=2):
+        errors = []
+        counts = import_csv(
+            self.user,
+            kind,
+            lines,
+            lambda row, error: errors.append((row, sorted(error))),
+            batch_size=batch_size,
+        )
+        return counts, errors
+
+    def test_invalid_rows_are_skipped(self):
+        counts, errors = self.import_lines(
+            [
+                "loan_name,amount,interest_rate,due_date",
+                "Car,1000,4.5,2030-01-01",
+                "House,-5,4.5,2030-01-01",
+                "Bike,200,3,2030-06-01",
+                "Boat,300,three,never",
+                "Phone,100,0,2027-01-01",
+            ]
+        )
+        self.assertEqual(counts, (3, 2))
+        self.assertEqual(errors, [(3, ["amount"]), (5, ["due_date", "interest_rate"])])
+        self.assertQuerySetEqual(
+            Loans.objects.filter(user_name=self.user).order_by("pk"),
+            ["Car", "Bike", "Phone"],
+            transform=lambda loan: loan.loan_name,
+        )
+        self.assertTrue(
+            Job.objects.filter(user_name=self.user, kind=RECOMPUTE_SNAPSHOT).exists()
+        )
+
+    def test_missing_column(self):
+        counts, errors = self.import_lines(
+            ["investment_name,amount", "Index fund,100"], kind="investments"
+        )
+        self.assertEqual(counts, (0, 0))
+        self.assertEqual(errors, [(1, ["category_name"])])
+
+    def test_upload(self):
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse("import_data"), import_post_data("investments", rows=3)
+        )
+        self.assertEqual(response.context["imported"], 3)
+        self.assertEqual(Investment.objects.filter(user_name=self.user).count(), 3)
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        (cls.user,) = seed_users(
+            users=1, budgets=2, allocations=3, loans=3, investments=4, days=10
+        )
+        Budget.objects.create(user_name=cls.user, budget_name="Empty", amount=100)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_csv(self):
+        response = self.client.get(reverse("export_data"))
+        self.assertTrue(response.streaming)
+        lines = response.getvalue().decode().splitlines()
+        self.assertEqual(lines[0], "table,budget_name,amount,category_name,percentage")
+        self.assertEqual(lines[7], "budgets,Empty,100.00,,")
+        tables = [line.split(",")[0] for line in lines]
+        self.assertEqual(tables.count("table"), 5)
+        self.assertEqual(
+            [
+                tables.count(table)
+                for table in dict.fromkeys(tables)
+                if table != "table"
+            ],
+            [2 * 3 + 1, 3, 4, 10, 10],
+        )
+
+    def test_ndjson_in_chunks(self):
+        response = self.client.get(reverse("export_data"), {"format": "ndjson"})
+        content = response.getvalue().decode()
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(rows), 7 + 3 + 4 + 10 + 10)
+        self.assertEqual(set(rows[-1]), {"table", "date", "total_net_worth"})
+
+        chunks = list(export_chunks(self.user, "ndjson", chunk_size=4))
+        self.assertEqual("".join(chunks), content)
+
+        async def read_async():
+            return [chunk async for chunk in aexport_chunks(self.user, "ndjson", 4)]
+
+        self.assertEqual(async_to_sync(read_async)(), chunks)
+
+        response = self.client.get(reverse("export_data"), {"format": "xml"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = export_user_to_file(self.user.pk, "csv", directory)
+            with gzip.open(path, "rt", newline="") as file:
+                self.assertEqual(file.read(), "".join(export_chunks(self.user, "csv")))
+
+
+class StartupTests(TestCase):
+    def test_views_load_without_heavy_modules(self):
+        command = bench_startup.Command()
+        report = json.loads(command.run_script(False).stdout)
+        self.assertEqual(report["heavy_modules"], [])
+
+        # The first chart still builds, importing what it needs then
+        report = json.loads(command.run_script(True).stdout)
+        self.assertGreater(report["first_chart_ms"], 0)
+
+
+class FigureSpecTests(TestCase):
+    def figure_json(self, chart_html):
+        """Returns the data and layout arguments of the Plotly.newPlot call."""
+        arguments = chart_html.split("Plotly.newPlot(", 1)[1].rsplit(")", 1)[0]
+        return json.loads(f"[{arguments}]")[1:3]
+
+    def test_line_chart(self):
+        context = LineChartBuilder(
+            {"x": [date(2024, 1, 1), date(2024, 1, 2)], "y": [1, 2.5]},
+            {},
+            title="Net worth",
+        ).build_chart()
+        data, layout = self.figure_json(context["line_chart"])
+        self.assertEqual(data[0]["x"], ["2024-01-01", "2024-01-02"])
+        self.assertEqual(data[0]["mode"], "lines+markers")
+        self.assertEqual(layout["title"], {"x": 0.05, "text": "Net worth"})
+        self.assertEqual(layout["xaxis"]["gridcolor"], "LightGray")
+
+    def test_pie_chart_adds_other(self):
+        chart = PieChartBuilder(1000, {})
+        chart.add_allocation("food", 40)
+        data, layout = self.figure_json(chart.build_chart()["pie_chart"])
+        self.assertEqual(data[0]["labels"], ["Food", "Other"])
+        self.assertEqual(data[0]["values"], [400, 600])
+
+    def test_json_is_safe_in_script_elements(self):
+        self.assertEqual(to_json(["</script>"]), '["\\u003c/script\\u003e"]')
+
+
+class SvgChartTests(TestCase):
+    def test_output_is_deterministic(self):
+        figures = [
+            lambda: pie_figure(["Food", "Rent <home>"], [400, 600], {"width": 600}),
+            lambda: line_figure(
+                [date(2024, 1, day) for day in range(1, 31)],
+                [day * 10.5 for day in range(30)],
+                {"title": {"text": "Net worth"}},
+            ),
+        ]
+        for figure in figures:
+            svg = render_svg(figure())
+            self.assertEqual(svg, render_svg(figure()))
+            self.assertTrue(svg.startswith("<svg"))
+            self.assertNotIn("<script", svg)
+        self.assertIn("Rent &lt;home&gt;", render_svg(figures[0]()))
+
+    def test_empty_series(self):
+        self.assertIn("No data yet", render_svg(line_figure([], [], {})))
@@ -12,5 +12,11 @@ urlpatterns = [
     path('loan_delete/<int:pk>/', views.LoanDeleteView.as_view(), name='loan_delete'),
     path('portfolio_creation/', views.PortfolioCreationView.as_view(), name='portfolio_creation'),
     path('net-worth/', views.NetWorthView.as_view(), name='net_worth'),
+    path('import/', views.ImportView.as_view(), name='import_data'),
+    path('export/', views.ExportView.as_view(), name='export_data'),
+    path('api/budget/preview/', views.BudgetPreviewView.as_view(), name='api_budget_preview'),
+    path('api/net-worth/series/', views.NetWorthSeriesView.as_view(), name='api_net_worth_series'),
+    path('api/investments/series/', views.InvestmentSeriesView.as_view(), name='api_investment_series'),
+    path('charts/<slug:digest>.svg', views.ChartImageView.as_view(), name='chart_image'),
     path('logout/', auth_views.LogoutView.as_view(next_page='login'), name='logout'),
 ]
\ No newline at end of file
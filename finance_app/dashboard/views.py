@@ -1,8 +1,24 @@
+import codecs
+import hmac
+
 from django.shortcuts import render
 from django.views import View
 from django.views.generic import TemplateView, ListView, DeleteView
-from django.http import HttpResponseRedirect
+from django.http import (
+    HttpResponse,
+    HttpResponseRedirect,
+    FileResponse,
+    Http404,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.cache import patch_cache_control, get_conditional_response, quote_etag
 from django.contrib.auth.mixins import LoginRequiredMixin
+from .mixins import AsyncLoginRequiredMixin
 from django.urls import reverse_lazy
 from django.forms import formset_factory, modelformset_factory
 from datetime import date
@@ -20,15 +36,51 @@ from .forms import (
     BudgetForm,
     AllocationForm,
     LoanForm,
+    LoanProjectionForm,
     InvestmentForm,
+    ImportForm,
 )
 from .functions.pieChart import (
+    PIE_CHART_LAYOUT,
+    cached_budget_pie_chart,
     create_pie_chart_from_form,
-    create_pie_chart_from_budget,
     create_a_pie_chart_from_investments,
+    pie_chart_from_form,
+)
+from .functions.line_chart import (
+    DEFAULT_MAX_POINTS,
+    SNAPSHOT_LINE_CHARTS,
+    cached_snapshot_line_chart,
+    line_chart_layout,
+    snapshot_series,
+    snapshot_signature,
+    window_start,
+)
+from .functions.data_export import EXPORT_FORMATS, aexport_chunks, export_chunks
+from .functions.metrics import render_prometheus
+from .functions.projection import cached_projection_chart
+from .list_and_dictionaries.statuses import (
+    CHART_DATE_RANGES,
+    PRERENDER_CHARTS,
+    RECOMPUTE_SNAPSHOT,
 )
-from .functions.line_chart import create_line_chart
-from .functions.calculating_total_amount import calculate_total_loan_amount
+from .functions.dashboard_summary import dashboard_summary
+from .functions.financial_aggregates import (
+    aloan_summary,
+    loan_summary,
+    investment_totals_by_category,
+)
+from .functions.csv_import import CSV_IMPORT_FORMS, import_columns, import_csv
+from .functions.jobs import enqueue_job
+from .functions.snapshots import record_investments_snapshot
+from .functions.chart_cache import (
+    bump_data_version,
+    get_chart_image,
+    store_chart_image,
+)
+from .functions.chart_renderers import chart_date_range, chart_renderer
+from .functions.figure_spec import pie_figure
+from .functions.plotly_assets import plotly_js_source_path, plotly_js_static_name
 
 # Create your views here.
 AllocationFormSet = formset_factory(
@@ -42,15 +94,112 @@ InvestmentFormSet = formset_factory(
 # All views in this file are related to the dashboard functionality of the application.
 
 
+def add_svg_line_chart(request, context, model):
+    """Adds a server-rendered SVG line chart of a snapshot model to the context, for ?chart=svg pages.
+    The window comes from ?range= instead of the JavaScript range buttons.
+    """
+    date_range = chart_date_range(request)
+    context["chart_range"] = date_range
+    context["line_chart"] = cached_snapshot_line_chart(request.user, model, date_range)
+    context["line_chart_image"] = store_chart_image(request.user, context["line_chart"])
+    return context
+
+
+def add_loan_projection(request, context, loans):
+    """Adds the payoff projection of the user's loans to the context, with the strategy and
+    extra monthly payment chosen in the projection form (?strategy=&extra_payment=).
+    """
+    form = LoanProjectionForm(request.GET if "strategy" in request.GET else None)
+    context["projection_form"] = form
+    if not loans or (form.is_bound and not form.is_valid()):
+        return context
+
+    from .functions.amortization import compare_strategies  # numpy, only needed with loans
+
+    if form.is_bound:
+        strategy, extra_payment = (
+            form.cleaned_data["strategy"],
+            form.cleaned_data["extra_payment"],
+        )
+    else:
+        strategy, extra_payment = form["strategy"].initial, form["extra_payment"].initial
+    context["loan_projection"] = compare_strategies(loans, strategy, extra_payment)
+    return context
+
+
 class DashboardView(TemplateView):
     """View for the dashboard.
     This view serves as the main entry point for the dashboard, providing an overview of the user's
     financial data, including budgets, loans, and investments.
     It renders the dashboard template and can be extended to include additional functionality in the future.
+    Signed-in users also get an overview of their finances, read with the async ORM.
     """
 
     template_name = "dashboard/dashboard.html"
 
+    async def get(self, request, *args, **kwargs):
+        context = self.get_context_data(**kwargs)
+        request.user = await request.auser()
+        if request.user.is_authenticated:
+            context["summary"] = await dashboard_summary(request.user)
+        return self.render_to_response(context)
+
+
+class PlotlyJSView(View):
+    """Serves the content-hashed plotly.js bundle with long-lived cache headers.
+    Only used when Django itself serves STATIC_URL; a front web server can serve the collected file instead.
+    """
+
+    def get(self, request, filename, *args, **kwargs):
+        if filename != plotly_js_static_name().rsplit("/", 1)[-1]:
+            raise Http404("Unknown plotly.js bundle.")
+        response = FileResponse(
+            open(plotly_js_source_path(), "rb"), content_type="text/javascript"
+        )
+        patch_cache_control(
+            response, public=True, max_age=settings.PLOTLY_JS_MAX_AGE, immutable=True
+        )
+        return response
+
+
+class MetricsView(View):
+    """Serves the request, query, database-write and chart cache metrics of every worker on this node
+    in the Prometheus text format. Scrapers must send the METRICS_TOKEN bearer token when one is set,
+    otherwise only METRICS_ALLOWED_IPS may scrape it.
+    """
+
+    def is_allowed(self, request):
+        if settings.METRICS_TOKEN:
+            token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+            return hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode())
+        return request.META.get("REMOTE_ADDR") in settings.METRICS_ALLOWED_IPS
+
+    def get(self, request, *args, **kwargs):
+        if not self.is_allowed(request):
+            raise Http404()
+        response = HttpResponse(
+            render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8"
+        )
+        patch_cache_control(response, no_store=True)
+        return response
+
+
+class ChartImageView(LoginRequiredMixin, View):
+    """Serves one of the user's SVG charts by its content hash (see chart_cache.store_chart_image).
+    The name changes with the content, so the browser may keep it for a year.
+    """
+
+    def get(self, request, digest, *args, **kwargs):
+        svg = get_chart_image(request.user, digest)
+        if svg is None:
+            raise Http404("Unknown or expired chart.")
+        response = HttpResponse(svg, content_type="image/svg+xml")
+        response["ETag"] = quote_etag(digest)
+        patch_cache_control(
+            response, private=True, max_age=settings.CHART_IMAGE_MAX_AGE, immutable=True
+        )
+        return response
+
 
 class BudgetView(LoginRequiredMixin, View):
     """View for managing the budget.
@@ -60,13 +209,20 @@ class BudgetView(LoginRequiredMixin, View):
     allows users to allocate percentages to various categories.
     """
 
+    # Figure the page's script fills with the slices from BudgetPreviewView
+    pie_chart_template = pie_figure([], [], PIE_CHART_LAYOUT)
+
     def get(self, request, *args, **kwargs):
         budget_form = BudgetForm(prefix="budget")
         allocation_formset = AllocationFormSet(prefix="allocations")
         return render(
             request,
             "dashboard/budget_creation.html",
-            {"budget": budget_form, "formset": allocation_formset},
+            {
+                "budget": budget_form,
+                "formset": allocation_formset,
+                "pie_chart_template": self.pie_chart_template,
+            },
         )
 
     def post(self, request, *args, **kwargs):
@@ -76,15 +232,19 @@ class BudgetView(LoginRequiredMixin, View):
         context = {
             "budget": budget_form,
             "formset": formset,
+            "pie_chart_template": self.pie_chart_template,
         }
 
         if formset.is_valid() and budget_form.is_valid():
 
             action = request.POST.get("action")
+            renderer = chart_renderer(request)
 
             # creating pie chart
             if action == "submit_budget":
-                context = create_pie_chart_from_form(budget_form, formset, context)
+                context = create_pie_chart_from_form(
+                    budget_form, formset, context, renderer
+                )
 
             if action == "save_budget":
                 # Save the budget and allocations
@@ -97,27 +257,31 @@ class BudgetView(LoginRequiredMixin, View):
                     return render(
                         request, "dashboard/budget_creation.html", context
                     )
-                else:
+
+                # One transaction: the budget row plus a single INSERT for all allocations
+                with transaction.atomic():
                     budget = Budget.objects.create(
                         user_name=user, budget_name=budget_name, amount=money_amount
                     )
-                    budget.save()
-
-                for form in formset:
-
-                    category_name = form.cleaned_data.get("category")
-                    percentage = form.cleaned_data.get("percentage")
-
-                    if category_name and percentage:
-                        category = Category.objects.create(
-                            category_name=category_name,
-                            percentage=percentage,
-                            budget=budget,
-                        )
-                        category.save()
+                    Category.objects.bulk_create(
+                        [
+                            Category(
+                                category_name=form.cleaned_data.get("category"),
+                                percentage=form.cleaned_data.get("percentage"),
+                                budget=budget,
+                            )
+                            for form in formset
+                            if form.cleaned_data.get("category")
+                            and form.cleaned_data.get("percentage")
+                        ]
+                    )
 
+                bump_data_version(user)
+                enqueue_job(user, PRERENDER_CHARTS)
                 context["message"] = "Budget and allocations saved successfully."
-                context = create_pie_chart_from_form(budget_form, formset, context)
+                context = create_pie_chart_from_form(
+                    budget_form, formset, context, renderer
+                )
                 context["budget"] = BudgetForm(prefix="budget")  # Reset the budget form
                 context["formset"] = AllocationFormSet(
                     prefix="allocations"
@@ -126,7 +290,39 @@ class BudgetView(LoginRequiredMixin, View):
         return render(request, "dashboard/budget_creation.html", context)
 
 
-class BudgetListView(LoginRequiredMixin, ListView):
+class BudgetPreviewView(LoginRequiredMixin, View):
+    """Returns the pie chart slices of the budget form as JSON, so the budget page can update its chart
+    in place as the user types instead of posting the whole form with "submit_budget".
+    Takes the same form data as BudgetView. Responds with {"labels": [...], "values": [...]},
+    plus the rendered "svg" for ?chart=svg, or with {"errors": {...}} and status 400.
+    """
+
+    def post(self, request, *args, **kwargs):
+        budget_form = BudgetForm(request.POST, prefix="budget")
+        formset = AllocationFormSet(request.POST, prefix="allocations")
+        if not (formset.is_valid() and budget_form.is_valid()):
+            errors = budget_form.errors.get_json_data()
+            for index, form_errors in enumerate(formset.errors):
+                for field, field_errors in form_errors.get_json_data().items():
+                    errors[f"allocations-{index}-{field}"] = field_errors
+            if formset.non_form_errors():
+                errors["allocations"] = formset.non_form_errors().get_json_data()
+            return JsonResponse({"errors": errors}, status=400)
+
+        renderer = chart_renderer(request)
+        chart = pie_chart_from_form(budget_form, formset, {}, renderer)
+        if chart.percentage_sum < 0:
+            message = "Total percentage cannot exceed 100%"
+            return JsonResponse({"errors": {"allocations": [{"message": message}]}}, status=400)
+
+        labels, values = chart.slices()
+        preview = {"labels": labels, "values": [float(value) for value in values]}
+        if renderer == "svg":
+            preview["svg"] = chart.build_chart()["pie_chart"]
+        return JsonResponse(preview, json_dumps_params={"separators": (",", ":")})
+
+
+class BudgetListView(AsyncLoginRequiredMixin, ListView):
     """View for listing all budgets associated with the logged-in user.
     This view retrieves all budgets created by the user and displays them in a list format.
     It uses the ListView generic view to handle the retrieval and rendering of the budget data.
@@ -141,8 +337,12 @@ class BudgetListView(LoginRequiredMixin, ListView):
             "allocations"
         )
 
+    async def get(self, request, *args, **kwargs):
+        self.object_list = [budget async for budget in self.get_queryset()]
+        return self.render_to_response(self.get_context_data())
+
 
-class BudgetDetailView(LoginRequiredMixin, TemplateView):
+class BudgetDetailView(AsyncLoginRequiredMixin, TemplateView):
     """View for displaying the details of a specific budget.
     This view retrieves a budget by its primary key (pk) and displays its details,
     including the budget amount and its associated allocations.
@@ -152,15 +352,25 @@ class BudgetDetailView(LoginRequiredMixin, TemplateView):
     
     template_name = "dashboard/budget_detail_view.html"
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
+    async def get(self, request, *args, **kwargs):
+        context = self.get_context_data(**kwargs)
         budget_id = self.kwargs.get("pk")
-        budget = Budget.objects.prefetch_related("allocations").get(id=budget_id)
+        budget = await Budget.objects.prefetch_related("allocations").aget(id=budget_id)
         context["budget"] = budget
         context["allocations"] = budget.allocations.all()
-        # Create pie chart from budget allocations
-        context = create_pie_chart_from_budget(context, budget.amount)
-        return context
+        renderer = chart_renderer(request)
+
+        def cached_pie_chart():
+            # Built from the prefetched allocations on a cache miss, no queries
+            pie_chart = cached_budget_pie_chart(request.user, budget, renderer)
+            image = store_chart_image(request.user, pie_chart) if renderer == "svg" else None
+            return pie_chart, image
+
+        # Cache lookups and chart building run in a worker thread
+        context["pie_chart"], context["pie_chart_image"] = await sync_to_async(
+            cached_pie_chart, thread_sensitive=False
+        )()
+        return self.render_to_response(context)
 
 
 class BudgetDeleteView(LoginRequiredMixin, DeleteView):
@@ -169,26 +379,43 @@ class BudgetDeleteView(LoginRequiredMixin, DeleteView):
     model = Budget
     success_url = reverse_lazy("your_budget")
 
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        bump_data_version(self.object.user_name)
+        return response
 
-class LoanView(LoginRequiredMixin, View):
+
+class LoanView(AsyncLoginRequiredMixin, TemplateView):
     """View for managing loan-related information.
-    This view handles displaying loan information and processing any related actions."""
+    This view handles displaying loan information and processing any related actions.
+    It also projects the payoff of the loans with an avalanche or snowball strategy."""
 
-    def get(self, request, *args, **kwargs):
-        context = {
-            "loan_form": LoanForm(prefix="loan"),
-        }
-        # Fetching loans related to the user
-        user_loans = request.user.loans.all()
-        if user_loans.exists():
-            context["loans"] = user_loans
-            context["total_amount"] = calculate_total_loan_amount(request.user)
+    template_name = "dashboard/loan_view.html"
+
+    async def get(self, request, *args, **kwargs):
+        context = self.get_context_data(**kwargs)
+        context["loan_form"] = LoanForm(prefix="loan")
+
+        # Async ORM queries share one thread, so they are awaited one after the other
+        loans = [loan async for loan in request.user.loans.all()]
+        if loans:
+            context["loans"] = loans
+            context["loan_summary"] = await aloan_summary(request.user)
         else:
             context["message"] = "No loans found for this user."
+        # The NumPy projections run in a worker thread, they need no queries
+        context = await sync_to_async(add_loan_projection, thread_sensitive=False)(
+            request, context, loans
+        )
 
-        return render(request, "dashboard/loan_view.html", context)
+        # A TemplateResponse: Django renders it in a thread, off the event loop
+        return self.render_to_response(context)
 
-    def post(self, request, *args, **kwargs):
+    async def post(self, request, *args, **kwargs):
+        # Writes stay synchronous, in one thread with their transaction
+        return await sync_to_async(self.add_loan)(request, *args, **kwargs)
+
+    def add_loan(self, request, *args, **kwargs):
         loan_form = LoanForm(request.POST, prefix="loan")
         context = {"loan_form": loan_form}
 
@@ -196,16 +423,18 @@ class LoanView(LoginRequiredMixin, View):
             loan = loan_form.save(commit=False)
             loan.user_name = request.user  # Associate the loan with the logged-in user
             loan.save()
+            enqueue_job(request.user, RECOMPUTE_SNAPSHOT)
+            bump_data_version(request.user)
             context["message"] = "Loan created successfully."
-            user_loans = request.user.loans.all()
-            context["loans"] = user_loans
             context["loan_form"] = LoanForm(
                 prefix="loan"
             )  # Reset the form for new entry
 
-        context["total_amount"] = calculate_total_loan_amount(request.user)
+        context["loans"] = list(request.user.loans.all())
+        context["loan_summary"] = loan_summary(request.user)
+        context = add_loan_projection(request, context, context["loans"])
 
-        return render(request, "dashboard/loan_view.html", context)
+        return render(request, self.template_name, context)
 
 
 class LoanDeleteView(LoginRequiredMixin, DeleteView):
@@ -213,6 +442,12 @@ class LoanDeleteView(LoginRequiredMixin, DeleteView):
     model = Loans
     success_url = reverse_lazy("loans")
 
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        enqueue_job(self.object.user_name, RECOMPUTE_SNAPSHOT)
+        bump_data_version(self.object.user_name)
+        return response
+
 
 class PortfolioCreationView(LoginRequiredMixin, View):
     """View for managing the user's investment portfolio.
@@ -221,16 +456,22 @@ class PortfolioCreationView(LoginRequiredMixin, View):
     """
 
     def create_chart_data(self, request, context):
-        """Helper function to create chart data for investments."""
-        qs = InvestmentsThroughTime.objects.filter(user_name=request.user).all()
-        
-        if qs.exists():
-            context = create_line_chart(
-                context,
-                qs,
-                ["date", "amount"],
-                "Investments Over Time",
-                y_axis_label="Investment Value",
+        """Helper function to create chart data for investments.
+        The series itself is fetched by the browser from InvestmentSeriesView,
+        or rendered here as SVG for ?chart=svg. The projection of the portfolio
+        is rendered here (see functions/projection.py).
+        """
+        if chart_renderer(request) == "svg":
+            context = add_svg_line_chart(request, context, InvestmentsThroughTime)
+        else:
+            title, y_axis_label = SNAPSHOT_LINE_CHARTS[InvestmentsThroughTime]
+            context["line_chart_layout"] = line_chart_layout(
+                title, "Date", y_axis_label
+            )
+        context["investment_totals"] = investment_totals_by_category(request.user)
+        if context["investment_totals"]:
+            context["projection_chart"] = cached_projection_chart(
+                request.user, context["investment_totals"], chart_renderer(request)
             )
         return context
 
@@ -251,40 +492,41 @@ class PortfolioCreationView(LoginRequiredMixin, View):
         if investment_form.is_valid():
             action = request.POST.get("action")
             total_sum_of_investments = 0
+            investments = []
 
             for form in investment_form:
                 if form.cleaned_data.get("investment_name"):
                     investment = form.save(commit=False)
                     investment.user_name = request.user
-                    investment.save()
+                    investments.append(investment)
                     total_sum_of_investments += form.cleaned_data.get("amount", 0)
 
+            # One transaction: a single INSERT for all investments plus the daily snapshot and its
+            # rollups, so the series endpoints never serve rollups older than their ETag.
+            # The net worth snapshot is recomputed by a background job.
+            with transaction.atomic():
+                Investment.objects.bulk_create(investments)
+
+                if action == "save_portfolio_value":
+                    record_investments_snapshot(
+                        request.user,
+                        total_sum_of_investments,
+                        date.today(),
+                    )
+                    enqueue_job(request.user, RECOMPUTE_SNAPSHOT)
+
+            bump_data_version(request.user)
             context["message"] = "Investments submitted successfully."
 
             # rendering a pie chart
 
             context = create_a_pie_chart_from_investments(
-                investment_form, context, total_sum_of_investments
+                investment_form,
+                context,
+                total_sum_of_investments,
+                chart_renderer(request),
             )
 
-            if action == "save_portfolio_value":
-                current_date = date.today()
-                exists = InvestmentsThroughTime.objects.filter(
-                    user_name=request.user, date=current_date
-                ).exists()
-
-                if not exists:
-                    InvestmentsThroughTime.objects.create(
-                        user_name=request.user,
-                        amount=total_sum_of_investments,
-                        date=current_date,
-                    )
-
-                if exists:
-                    InvestmentsThroughTime.objects.filter(
-                        user_name=request.user, date=current_date
-                    ).update(amount=total_sum_of_investments)
-
             context = self.create_chart_data(request, context)
 
             context["investment_form"] = (
@@ -294,54 +536,165 @@ class PortfolioCreationView(LoginRequiredMixin, View):
         return render(request, "dashboard/portfolio_creation.html", context)
 
 
-class NetWorthView(LoginRequiredMixin, TemplateView):
+class NetWorthView(AsyncLoginRequiredMixin, TemplateView):
     """View for displaying the user's net worth.
     This view calculates the user's net worth based on their investments and loans,
     and displays it over time using a line chart.
-    It updates the net worth daily and provides a historical view of the user's financial health.
+    It provides a historical view of the user's financial health from the stored daily snapshots.
     """
     
     template_name = "dashboard/net_worth.html"
 
-    def update_net_worth(self, request):
-        current_date = date.today()
-        exists = NetWorth.objects.filter(
-            user_name=request.user, date=current_date
-        ).exists()
-
-        # Calculate total net worth
-        total_net_worth = 0.00
-        total_net_worth -= float(calculate_total_loan_amount(request.user))
-        last_investments = InvestmentsThroughTime.objects.filter(
-            user_name=request.user
-        ).last()
-        last_investments_amount = last_investments.amount if last_investments else 0.00
-        total_net_worth += float(last_investments_amount)
-
-        if not exists:
-            NetWorth.objects.create(
-                user_name=request.user,
-                total_net_worth=total_net_worth,
-                date=current_date,
+    async def get(self, request, *args, **kwargs):
+        context = self.get_context_data(**kwargs)
+        # Read-only: snapshots are written when loans or investments change
+        # (by a recompute_snapshot job, see functions/jobs.py) and by the snapshot_net_worth command.
+        # The series itself is fetched by the browser from NetWorthSeriesView,
+        # or rendered here as SVG for ?chart=svg.
+        if chart_renderer(request) == "svg":
+            context = await sync_to_async(add_svg_line_chart)(request, context, NetWorth)
+        else:
+            title, y_axis_label = SNAPSHOT_LINE_CHARTS[NetWorth]
+            context["line_chart_layout"] = line_chart_layout(
+                title, "Date", y_axis_label
             )
+        return self.render_to_response(context)
 
-        if exists:
-            NetWorth.objects.filter(user_name=request.user, date=current_date).update(
-                total_net_worth=total_net_worth
-            )
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        self.update_net_worth(self.request)
-        user = self.request.user
-        qs = NetWorth.objects.filter(user_name=user).all()
-
-        context = create_line_chart(
-            context,
-            qs,
-            ["date", "total_net_worth"],
-            "Net Worth Over Time",
-            y_axis_label="Net Worth Value",
+class ImportView(LoginRequiredMixin, View):
+    """View for importing loans or investments from a CSV file, e.g. exported from a spreadsheet.
+    The upload is parsed and inserted row by row in batches (see functions/csv_import.py),
+    and the first IMPORT_MAX_REPORTED_ERRORS invalid rows are listed with their errors.
+    """
+
+    def render_page(self, request, context):
+        context["columns"] = {kind: import_columns(kind) for kind in CSV_IMPORT_FORMS}
+        return render(request, "dashboard/import_data.html", context)
+
+    def get(self, request, *args, **kwargs):
+        return self.render_page(request, {"import_form": ImportForm()})
+
+    def post(self, request, *args, **kwargs):
+        import_form = ImportForm(request.POST, request.FILES)
+        context = {"import_form": import_form}
+        if not import_form.is_valid():
+            return self.render_page(request, context)
+
+        errors = []
+
+        def report_error(row_number, row_errors):
+            if len(errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+                errors.append((row_number, row_errors))
+
+        # Lines are decoded one at a time, straight from the upload
+        lines = codecs.iterdecode(import_form.cleaned_data["file"], "utf-8-sig")
+        imported, skipped = import_csv(
+            request.user, import_form.cleaned_data["kind"], lines, report_error
         )
 
-        return context
+        context.update(
+            imported=imported,
+            skipped=skipped,
+            errors=errors,
+            errors_truncated=skipped > len(errors),
+        )
+        return self.render_page(request, context)
+
+
+class ExportView(LoginRequiredMixin, View):
+    """Streams all of the user's data (budgets with their allocations, loans, investments and
+    the investment and net worth histories) as a CSV or NDJSON download: ?format=csv|ndjson.
+    Rows are read and sent in chunks, so the export never has to fit in memory. Under ASGI
+    the chunks come from an async generator, which the server can send without a thread.
+    """
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get("format", "csv")
+        if export_format not in EXPORT_FORMATS:
+            formats = ", ".join(EXPORT_FORMATS)
+            return JsonResponse({"error": f"format must be one of {formats}."}, status=400)
+
+        chunks = aexport_chunks if isinstance(request, ASGIRequest) else export_chunks
+        content_type, extension = EXPORT_FORMATS[export_format]
+        return StreamingHttpResponse(
+            chunks(request.user, export_format),
+            content_type=f"{content_type}; charset=utf-8",
+            headers={
+                "Content-Disposition": f'attachment; filename="finance_data.{extension}"'
+            },
+        )
+
+
+# JSON API used by the browser-rendered charts.
+
+
+class SeriesAPIView(LoginRequiredMixin, View):
+    """Returns a user's time series as compact columnar JSON: {"x": [dates], "y": [values]}.
+    Query parameters: range (one of CHART_DATE_RANGES, default "all") and points (the point
+    budget, at most MAX_POINTS). Ranges with more daily rows than the budget are read from
+    the weekly or monthly rollups and anything still above the budget is downsampled.
+    Responses carry an ETag built from a single aggregate query, so an unchanged series
+    is answered with a 304 without loading or serializing any rows.
+    """
+
+    model = None
+    MAX_POINTS = 5000
+
+    def get_series(self, date_range, signature, max_points):
+        """Reads the daily rows when they fit in max_points, or the finest rollup that does."""
+        return snapshot_series(
+            self.model,
+            self.request.user,
+            date_range,
+            max_points,
+            signature["first_date"],
+            signature["last_date"],
+            signature["count"],
+        )
+
+    def get(self, request, *args, **kwargs):
+        date_range = request.GET.get("range", "all")
+        try:
+            max_points = int(request.GET.get("points", DEFAULT_MAX_POINTS))
+        except ValueError:
+            max_points = 0
+        if date_range not in CHART_DATE_RANGES or not 3 <= max_points <= self.MAX_POINTS:
+            ranges = ", ".join(CHART_DATE_RANGES)
+            message = f"range must be one of {ranges} and points between 3 and {self.MAX_POINTS}."
+            return JsonResponse({"error": message}, status=400)
+
+        signature = snapshot_signature(self.model, request.user, date_range)
+        etag = quote_etag(
+            f"{request.user.pk}-{date_range}-{window_start(date_range)}-{max_points}-"
+            f"{signature['count']}-{signature['last_date']}-{signature['total']}"
+        )
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            series = (
+                self.get_series(date_range, signature, max_points)
+                if signature["count"]
+                else {"x": [], "y": []}
+            )
+            response = JsonResponse(
+                {
+                    "x": [day.isoformat() for day in series["x"]],
+                    "y": [float(value) for value in series["y"]],
+                },
+                json_dumps_params={"separators": (",", ":")},
+            )
+        response["ETag"] = etag
+        # Let the browser keep the series but revalidate it on every use.
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class NetWorthSeriesView(SeriesAPIView):
+    """Net worth over time."""
+
+    model = NetWorth
+
+
+class InvestmentSeriesView(SeriesAPIView):
+    """Total value of the investment portfolio over time."""
+
+    model = InvestmentsThroughTime
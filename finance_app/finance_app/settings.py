@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,11 +43,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "dashboard.middleware.PerformanceMiddleware",  # Server-Timing headers, keep it first
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "dashboard.middleware.ProfilerMiddleware",  # ?profile=1 for staff users, needs request.user
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     # 'dashboard.middleware.LoginRequiredMiddleware',  # Custom middleware for login requirement
@@ -56,7 +59,8 @@ ROOT_URLCONF = "finance_app.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates reporting render times to dashboard.middleware.PerformanceMiddleware
+        "BACKEND": "dashboard.template_backends.TimedDjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -64,6 +68,7 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "dashboard.context_processors.chart_renderer",
             ],
         },
     },
@@ -75,14 +80,127 @@ WSGI_APPLICATION = "finance_app.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite performance profiles, applied to every new connection through OPTIONS["init_command"].
+# "wal" lets readers run alongside a writer and makes commits cheap; "default" keeps SQLite's own
+# settings. Compare them with `python manage.py bench_sqlite`.
+SQLITE_PROFILES = {
+    "default": {},
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",  # Durable across application crashes, fsync only at checkpoints
+        "busy_timeout": 5000,  # Milliseconds to wait for a lock before "database is locked"
+        "cache_size": -20000,  # Negative values are KiB, so ~20 MB of page cache per connection
+        "mmap_size": 128 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+}
+SQLITE_PROFILE = os.environ.get("FINANCE_APP_SQLITE_PROFILE", "wal")
+# Pragmas stored in the database file rather than set per connection, with SQLite's defaults.
+# Setting them on every connection would rewrite the file on the first one (even for `check`),
+# so `python manage.py apply_sqlite_profile` sets them once per database instead.
+SQLITE_PERSISTENT_PRAGMAS = {"journal_mode": "DELETE"}
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": {
+            "init_command": ";".join(
+                f"PRAGMA {pragma}={value}"
+                for pragma, value in SQLITE_PROFILES[SQLITE_PROFILE].items()
+                if pragma not in SQLITE_PERSISTENT_PRAGMAS
+            ),
+            # Take the write lock when a transaction starts instead of failing to upgrade it later.
+            # Every atomic() block of the app writes (reads run in autocommit, outside transactions),
+            # so none of them takes the lock for nothing; in WAL mode readers never wait for it.
+            "transaction_mode": "IMMEDIATE",
+        },
     }
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Rendered charts, keyed per user on a data version (see dashboard/functions/chart_cache.py);
+    # line charts also on their snapshots, which other processes write.
+    "charts": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "charts",
+        "TIMEOUT": 60 * 60 * 24,
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+}
+
+# Running several worker processes? Share the chart cache between them through the file system.
+if os.environ.get("FINANCE_APP_CHART_CACHE_DIR"):
+    CACHES["charts"].update(
+        BACKEND="django.core.cache.backends.filebased.FileBasedCache",
+        LOCATION=os.environ["FINANCE_APP_CHART_CACHE_DIR"],
+    )
+
+CHART_CACHE_ALIAS = "charts"
+
+# Chart renderer: "plotly" (interactive, loads plotly.js) or "svg" (static inline SVG, no JavaScript).
+# A request can ask for the other one with ?chart=svg or ?chart=plotly.
+CHART_RENDERER = os.environ.get("FINANCE_APP_CHART_RENDERER", "plotly")
+CHART_IMAGE_MAX_AGE = 60 * 60 * 24 * 365  # SVG chart URLs carry their content hash
+
+
+# Metrics served on /metrics (Prometheus text format)
+# Every worker process adds its counters to this SQLite file, so any worker can serve the whole node.
+# Keep it on a local disk, one file per node.
+
+METRICS_DATABASE = os.environ.get("FINANCE_APP_METRICS_DB", str(BASE_DIR / "metrics.sqlite3"))
+METRICS_FLUSH_INTERVAL = 5  # seconds between writes of a worker's counters to METRICS_DATABASE
+METRICS_ALLOWED_IPS = ["127.0.0.1", "::1"]  # REMOTE_ADDR allowed to scrape /metrics without a token
+# When set, scrapers must send "Authorization: Bearer <token>" instead. Set it when a reverse proxy
+# runs on the same host: REMOTE_ADDR is then 127.0.0.1 for every client.
+METRICS_TOKEN = os.environ.get("FINANCE_APP_METRICS_TOKEN", "")
+
+# The tests keep METRICS_DATABASE in a temporary directory
+TEST_RUNNER = "dashboard.test_runner.TestRunner"
+
+
+# Monte Carlo projection of the portfolio value (see dashboard/functions/projection.py)
+
+PROJECTION_YEARS = 10
+PROJECTION_PATHS = 20000
+PROJECTION_SEED = 0  # Fixed, so the same portfolio always gets the same (cacheable) projection
+PROJECTION_CHUNK_SIZE = 2000  # paths simulated per task
+PROJECTION_PARALLEL_WORK = 10_000_000  # paths x months x categories from which a process pool runs the tasks
+PROJECTION_PROCESSES = None  # size of that pool, None for one process per CPU
+PROJECTION_ASSUMPTIONS = {}  # category -> (annual return, annual volatility), overriding INVESTMENT_ASSUMPTIONS
+
+
+# CSV import of loans and investments (see dashboard/functions/csv_import.py)
+
+IMPORT_BATCH_SIZE = 500  # rows per bulk INSERT and transaction
+IMPORT_MAX_REPORTED_ERRORS = 100  # invalid rows listed on the import page
+
+
+# Streaming export of a user's data (see dashboard/functions/data_export.py)
+
+EXPORT_CHUNK_SIZE = 2000  # rows read from the database and written to the response at a time
+
+
+# Background jobs (snapshot recomputation, chart pre-rendering), run by `python manage.py run_worker`.
+# The queue is a table in the default database; FINANCE_APP_JOBS_EAGER=1 runs jobs inside the request instead.
+
+JOBS_RUN_EAGERLY = os.environ.get("FINANCE_APP_JOBS_EAGER") == "1"
+JOB_TIMEOUT = 10 * 60  # seconds after which a running job is considered lost and queued again
+
+
+# Staff-only request profiler (?profile=1 or an X-Profile: 1 header)
+
+PROFILE_DIR = os.environ.get("FINANCE_APP_PROFILE_DIR", str(BASE_DIR / "profiles"))
+PROFILE_SAMPLE_INTERVAL = 0.001  # seconds between stack samples
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -121,6 +239,12 @@ STATIC_URL = "/static/"
 STATICFILES_DIRS = [
     BASE_DIR / "static",  # Directory for static files
 ]
+STATICFILES_FINDERS = [
+    "django.contrib.staticfiles.finders.FileSystemFinder",
+    "django.contrib.staticfiles.finders.AppDirectoriesFinder",
+    "dashboard.finders.PlotlyJSFinder",  # plotly.js under a content-hashed name
+]
+PLOTLY_JS_MAX_AGE = 60 * 60 * 24 * 365  # The bundle name changes with its content
 
 MEDIA_ROOT = BASE_DIR / "media"  # Directory for media files
 MEDIA_URL = "/media/"  # URL to access media files
@@ -16,12 +16,19 @@ Including another URLconf
 """
 
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from dashboard.views import MetricsView, PlotlyJSView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("", include("login.urls")),
     path("dashboard/", include("dashboard.urls")),
+    path("metrics", MetricsView.as_view(), name="metrics"),
+    re_path(
+        rf"^{settings.STATIC_URL.strip('/')}/dashboard/js/(?P<filename>plotly\.[0-9a-f]{{12}}\.min\.js)$",
+        PlotlyJSView.as_view(),
+        name="plotly_js",
+    ),
 ] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)